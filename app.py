@@ -1,8 +1,11 @@
-from ollama import chat
-from pydantic import BaseModel, Field
+from utils.llm_client import get_llm_client
+from pydantic import BaseModel, Field, ValidationError
 from typing import Optional, Literal, List
-from utils.ocr_tools.surya_ocr_tool import get_image_text_suryaocr
-from utils.ocr_tools.easy_ocr_tool import get_image_text_easyocr
+from utils.ocr_tools.multi_ocr import get_image_text_dual_ocr
+from utils.ocr_tools.reframe_ocr_text import extract_from_ocr_text
+from utils.ocr_tools.document_loader import load_document
+from utils.ocr_tools.model_registry import warm_up_models
+from utils.Document_validation.brighten import enhance_document_pages
 
 number_of_years_semesters = "2 years"
 
@@ -55,62 +58,83 @@ class Marksheet(BaseModel):
     )
 
 
+# Load the OCR models and the LLM once up front
+warm_up_models(easyocr_languages=['en'])
+llm_client = get_llm_client()
+llm_client.warm_up(['llama3.3'])
+
 image_path = "/root/document_ocr/images/12th/Document_2_App_1.pdf"
+document = load_document(image_path)  # rasterized once, shared by both OCRs
+enhance_document_pages(document, keep=True)  # corrects under-exposed pages; both OCRs reuse every page
 
-# extracting info using Two OCR-tools
-# 1) Using EasyOCR
-easy_ocr_text_extracted_ = get_image_text_easyocr(image_path)
+# extracting info using Two OCR-tools, run side by side
+surya_ocr_text_extracted, easy_ocr_text_extracted_ = get_image_text_dual_ocr(document)
 print("Easy OCR text extractor: \n", easy_ocr_text_extracted_)
-
-
-# 2) Using SuryaOCR
-surya_ocr_text_extracted = get_image_text_suryaocr(image_path)
 print("Surya OCR text extractor: \n", surya_ocr_text_extracted)
 
-response = chat(
-    messages=[
-        {
-            'role': 'user',
-            'content': """You are a helpful assistant, help me extract the important information from marksheet data provided below. 
-            The data is extracted from marksheet using OCR tools and the data might not be in a proper format. 
-            Make sure there are no simple mistakes like obtained marks being greater than the maximum marks.
-            Do not makeup any data and dont assume anything, Extract and return the information that is in the data.
-            
-            Output format:
-            1) Structure the data in a tabular format.
-            2) Make no assumptions about the data.
-            3) Return whatever information is available in the data provided.
-            4) We are using two OCR extractor to extract text for better understanding. 
-
-            As per the number of semester/years marks mentioned, you need to create individual tables for them
-
-            Here is the extracted data from two OCRs:
-            1) Surya OCR:\n """+ surya_ocr_text_extracted + "2) Easy OCR: \n" + easy_ocr_text_extracted_ \
-            + "Additional information: \n 1) Number of semester/Years marks in the marksheet: " + number_of_years_semesters \
-            "2) If the data is mismatching between two OCR extracted text then choose data from Surya OCR"
-
-        }
-    ],
-    model = 'llama3.3',
-    #format = Marksheet.model_json_schema(),
-)
-formatted_data_by_llm = response.message.content
-
-print(formatted_data_by_llm)
-
-
-response = chat(
-    messages=[
-        {
-            'role': 'user',
-            'content': """You are a helpful assistant who ll extract right infomration from the data provided.
-            The data below is the text extracted by using multiple OCRs and also the refined OCR data."""
-
-        }
-    ],
-    model = 'llama3.3',
-    format = Marksheet.model_json_schema(),
+def reframe_marksheet(surya_ocr_text, easy_ocr_text, client=None):
+    """Tabular rewrite of the OCR text; only used when the single-call extraction fails validation."""
+    response = (client or llm_client).chat(
+        messages=[
+            {
+                'role': 'user',
+                'content': """You are a helpful assistant, help me extract the important information from marksheet data provided below. 
+                The data is extracted from marksheet using OCR tools and the data might not be in a proper format. 
+                Make sure there are no simple mistakes like obtained marks being greater than the maximum marks.
+                Do not makeup any data and dont assume anything, Extract and return the information that is in the data.
+                
+                Output format:
+                1) Structure the data in a tabular format.
+                2) Make no assumptions about the data.
+                3) Return whatever information is available in the data provided.
+                4) We are using two OCR extractor to extract text for better understanding. 
+
+                As per the number of semester/years marks mentioned, you need to create individual tables for them
+
+                Here is the extracted data from two OCRs:
+                1) Surya OCR:\n """+ surya_ocr_text + "2) Easy OCR: \n" + easy_ocr_text \
+                + "Additional information: \n 1) Number of semester/Years marks in the marksheet: " + number_of_years_semesters \
+                + "2) If the data is mismatching between two OCR extracted text then choose data from Surya OCR"
+
+            }
+        ],
+        model = 'llama3.3',
+    )
+    formatted_data_by_llm = response.message.content
+    print(formatted_data_by_llm)
+    return formatted_data_by_llm
+
+
+def extract_marksheet(data, client=None):
+    """Extract the Marksheet fields from OCR (or reframed) text; None if the answer fails validation."""
+    try:
+        response = (client or llm_client).chat(
+            messages=[
+                {
+                    'role': 'user',
+                    'content': """You are a helpful assistant who ll extract right infomration from the marksheet data provided below.
+                    Make sure there are no simple mistakes like obtained marks being greater than the maximum marks.
+                    Do not makeup any data and dont assume anything, Extract and return the information that is in the data.
+                    Number of semester/Years marks in the marksheet: """ + number_of_years_semesters + """
+                    If the data is mismatching between two OCR extracted text then choose data from Surya OCR.
+
+                    """ + data
+
+                }
+            ],
+            model = 'llama3.3',
+            format = Marksheet,
+        )
+        return Marksheet.model_validate_json(response.message.content)
+    except ValidationError as ve:
+        print("Validation error:", ve)
+        return None
+
+
+# One schema-constrained call on both OCR texts; the tabular reframe pass
+# only runs if that answer fails validation
+result = extract_from_ocr_text(
+    extract_marksheet, surya_ocr_text_extracted, easy_ocr_text_extracted_,
+    client=llm_client, reframe_fallback=True, reframe=reframe_marksheet,
 )
-
-result = Marksheet.model_validate_json(response.message.content)
 print(result)
@@ -1,23 +1,96 @@
-from utils.ocr_tools.surya_ocr_tool import get_image_text_suryaocr
-from utils.ocr_tools.easy_ocr_tool import get_image_text_easyocr
-from utils.ocr_tools.reframe_ocr_text import reframe_the_ocr_text_into_a_proper_format
-from utils.Document_validation.electricity_bill import electricity_bill_extract_event_information
-from utils.Document_validation.blurness_detection.blurness_detection import blur_detection
-
-def document_type_verification(doc_path):
-    blurness_value = blur_detection(doc_path)
-    if blurness_value == False:
-        print("Image clear")
-        text_extracted_surya_ocr = get_image_text_suryaocr(doc_path)
-        #text_extracted_easy_ocr = get_image_text_easyocr(doc_path)
+import asyncio
+import os
+import time
+from utils.ocr_tools.model_registry import warm_up_models, get_model_metrics
+from utils.ocr_tools.multi_ocr import get_pages_cascade_ocr
+from utils.ocr_tools.document_loader import load_document
+from utils.ocr_tools.ocr_result import OcrDocument
+from utils.ocr_tools.ocr_cache import get_ocr_cache_stats
+from utils.llm_client import get_llm_client
+from utils.llm_cache import get_llm_cache_stats
+from utils.ocr_tools.reframe_ocr_text import extract_from_ocr_text, extract_from_ocr_text_async
+from utils.Document_validation.electricity_bill import electricity_bill_extract_event_information, electricity_bill_extract_event_information_async
+from utils.Document_validation.blurness_detection import is_page_blurry, process_document
+from utils.Document_validation.calibrate_quality import QUALITY_CALIBRATION_MODE, record_validation_outcome
+
+# Pages gated and OCRed together. The blur gate keeps the pages it decodes (and
+# corrects) for OCR, so each page is rasterized once and at most this many are
+# held at a time
+PIPELINE_WINDOW_PAGES = int(os.environ.get("PIPELINE_WINDOW_PAGES", "4"))
+
+
+def gated_ocr_text(document, calibration=QUALITY_CALIBRATION_MODE):
+    """Blur-check and OCR a document window by window.
+
+    Returns (text, gated): text is None when a page is blurry, except in
+    calibration mode, where the whole document is still read.
+    """
+    pages = []
+    gated = False
+    for first in range(0, document.page_count, PIPELINE_WINDOW_PAGES):
+        window = list(range(first, min(first + PIPELINE_WINDOW_PAGES, document.page_count)))
+        try:
+            # Every page must be readable; born-digital pages skip rasterization.
+            # Under-exposed pages are corrected first, so the gate scores the
+            # page OCR will read; others pass untouched
+            report = process_document(document, pages=window, keep=True, enhance=True)
+            if any(is_page_blurry(page) for page in report["pages"]):
+                gated = True
+                if not calibration:
+                    return None, gated
+            # Surya first; EasyOCR only re-reads the lines or pages Surya is unsure of
+            pages.extend(get_pages_cascade_ocr(document, first_page=first + 1, last_page=window[-1] + 1).pages)
+        except Exception as e:
+            return f"Error: Could not process the image. {str(e)}", gated
+        finally:
+            document.release_pages(window)
+    return OcrDocument(pages).text, gated
+
+
+def document_type_verification(doc_path, llm_client=None):
+    llm_client = llm_client or get_llm_client()
+    document = load_document(doc_path)
+    ocr_start = time.perf_counter()
+    text_extracted_surya_ocr, gated = gated_ocr_text(document)
+    ocr_seconds = time.perf_counter() - ocr_start
+    if text_extracted_surya_ocr is not None:
+        print("Image clear" if not gated else "Image not clear; read anyway for calibration")
         print("Surya OCR-> ", text_extracted_surya_ocr)
-        #print("Easy OCR-> ", text_extracted_easy_ocr)
-        formatted_text = reframe_the_ocr_text_into_a_proper_format(text_extracted_surya_ocr,  " ")
-        document_validation = electricity_bill_extract_event_information(formatted_text)
-    else:
+        llm_start = time.perf_counter()
+        # One schema-constrained call on the raw OCR text; the reframe pass
+        # only runs if that answer fails validation
+        document_validation = extract_from_ocr_text(
+            electricity_bill_extract_event_information, text_extracted_surya_ocr, " ",
+            client=llm_client, reframe_fallback=True,
+        )
+        # Labels for calibrate_quality.py (written only when QUALITY_OUTCOME_LOG is set);
+        # in calibration mode they include the documents the gate rejects
+        record_validation_outcome(doc_path, document_validation is None, ocr_seconds, time.perf_counter() - llm_start,
+                                  gated=gated)
+    if text_extracted_surya_ocr is None or gated:
         return ("Image is not clear to the OCR")
     return  document_validation
 
+async def document_type_verification_async(doc_path, llm_client=None):
+    # OCR and image work run on worker threads while the event loop keeps
+    # LLM requests for other documents in flight
+    document = await asyncio.to_thread(load_document, doc_path)
+    # Outcomes (and so calibration mode) are only recorded by document_type_verification
+    text_extracted_surya_ocr, gated = await asyncio.to_thread(gated_ocr_text, document, False)
+    if gated:
+        return ("Image is not clear to the OCR")
+    return await extract_from_ocr_text_async(
+        electricity_bill_extract_event_information_async, text_extracted_surya_ocr, " ",
+        client=llm_client, reframe_fallback=True,
+    )
+
+# Load the OCR models and LLMs once at service start instead of on the first document
+warm_up_models(easyocr_languages=['en'])
+get_llm_client().warm_up(['llama3.3:70b', 'llama3.1:8b'])
+
 image_path = "/root/rohit/document_ocr/images/151663301_Dec-24.pdf"
 document_validation_result = document_type_verification(image_path)
-print("Result -> ", document_validation_result)
\ No newline at end of file
+print("Result -> ", document_validation_result)
+print("OCR model metrics -> ", get_model_metrics())
+print("OCR cache -> ", get_ocr_cache_stats())
+print("LLM cache -> ", get_llm_cache_stats())
\ No newline at end of file
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ValidationError
 from typing import Literal, Optional
-from ollama import chat
+from utils.llm_client import AsyncLLMClient, LLMClient, get_async_llm_client, get_llm_client
 
 
 # Define the data model
@@ -15,17 +15,10 @@ class admission_letter(BaseModel):
     date: str
 
 
-def admission_letter_extract_event_information(formatted_text: str) -> Optional[dict]:
-    """
-    Extracts event information from the input text using OpenAI's API.
-    Args:
-        text (str): The input text containing document information.
-    Returns:
-        dict: Parsed document type and additional information or None if an error occurs.
-    """
-    try:
-        # Prepare the prompt
-        prompt = """
+def _chat_request(formatted_text: str) -> dict:
+    """Chat arguments (prompt, model, schema and options) for one document."""
+    # Prepare the prompt
+    prompt = """
 Aim: To analyze the provided document and predict if the text is from an achievement certificate or not.
 
 Procedure:
@@ -37,16 +30,49 @@ Procedure:
 The data to analyze: 
 """ + formatted_text
 
+    return dict(
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        model="llama3.3:70b",
+        format=admission_letter,
+        options={'temperature': 0.2},
+    )
+
 
+def admission_letter_extract_event_information(formatted_text: str, client: Optional[LLMClient] = None) -> Optional[dict]:
+    """
+    Extracts event information from the input text using OpenAI's API.
+    Args:
+        text (str): The input text containing document information.
+        client (LLMClient): Shared Ollama client; defaults to get_llm_client().
+    Returns:
+        dict: Parsed document type and additional information or None if an error occurs.
+    """
+    try:
         # Send the chat request
-        response = chat(
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            model="llama3.3:70b",
-            format=admission_letter.model_json_schema(),
-            options={'temperature': 0.2},
-        )
+        response = (client or get_llm_client()).chat(**_chat_request(formatted_text))
+
+        # Parse and validate the response
+        output_json = admission_letter.model_validate_json(response.message.content)
+        print("Validation successful:", output_json)
+        return output_json.dict()
+
+    except ValidationError as ve:
+        print("Validation error:", ve)
+    except Exception as e:
+        print("An error occurred during processing:", e)
+
+    return None
+
+
+async def admission_letter_extract_event_information_async(formatted_text: str, client: Optional[AsyncLLMClient] = None) -> Optional[dict]:
+    """
+    Async counterpart of admission_letter_extract_event_information,
+    using an AsyncLLMClient (get_async_llm_client() by default).
+    """
+    try:
+        response = await (client or get_async_llm_client()).chat(**_chat_request(formatted_text))
 
         # Parse and validate the response
         output_json = admission_letter.model_validate_json(response.message.content)
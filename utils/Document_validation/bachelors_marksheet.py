@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ValidationError
 from typing import Literal, Optional
-from ollama import chat
+from utils.llm_client import AsyncLLMClient, LLMClient, get_async_llm_client, get_llm_client
 
 
 # Define the data model
@@ -16,17 +16,10 @@ class bachelors_marksheet(BaseModel):
     # start_year: int
     # passing_year: int
 
-def extract_event_information(formatted_text: str) -> Optional[dict]:
-    """
-    Extracts event information from the input text using OpenAI's API.
-    Args:
-        text (str): The input text containing document information.
-    Returns:
-        dict: Parsed document type and additional information or None if an error occurs.
-    """
-    try:
-        # Prepare the prompt
-        prompt = """
+def _chat_request(formatted_text: str) -> dict:
+    """Chat arguments (prompt, model, schema and options) for one document."""
+    # Prepare the prompt
+    prompt = """
 Aim: To analyze the provided document and predict if the text is from a bachelors marksheet or not.
 
 Procedure:
@@ -38,16 +31,45 @@ Procedure:
 The data to analyze: 
 """ + formatted_text
 
+    return dict(
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        model="llama3.3:70b",
+        format=bachelors_masters_marksheet,
+        options={'temperature': 0.2},
+    )
 
+
+def extract_event_information(formatted_text: str, client: Optional[LLMClient] = None) -> Optional[dict]:
+    """
+    Extracts event information from the input text using OpenAI's API.
+    Args:
+        text (str): The input text containing document information.
+        client (LLMClient): Shared Ollama client; defaults to get_llm_client().
+    Returns:
+        dict: Parsed document type and additional information or None if an error occurs.
+    """
+    try:
         # Send the chat request
-        response = chat(
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            model="llama3.3:70b",
-            format=bachelors_masters_marksheet.model_json_schema(),
-            options={'temperature': 0.2},
-        )
+        response = (client or get_llm_client()).chat(**_chat_request(formatted_text))
+
+        # Parse and validate the response
+        output_json = bachelors_masters_marksheet.model_validate_json(response.message.content)
+        return output_json.dict()
+
+    except ValidationError as ve:
+        print("Validation error:", ve)
+    except Exception as e:
+        print("An error occurred during processing:", e)
+
+    return None
+
+
+async def extract_event_information_async(formatted_text: str, client: Optional[AsyncLLMClient] = None) -> Optional[dict]:
+    """Async counterpart of extract_event_information, using an AsyncLLMClient (get_async_llm_client() by default)."""
+    try:
+        response = await (client or get_async_llm_client()).chat(**_chat_request(formatted_text))
 
         # Parse and validate the response
         output_json = bachelors_masters_marksheet.model_validate_json(response.message.content)
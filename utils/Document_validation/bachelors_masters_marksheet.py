@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ValidationError
 from typing import Literal, Optional
-from ollama import chat
+from utils.llm_client import AsyncLLMClient, LLMClient, get_async_llm_client, get_llm_client
 
 
 # Define the data model
@@ -16,36 +16,59 @@ class bachelors_masters_marksheet(BaseModel):
     start_year: int
     passing_year: int
 
-def extract_event_information(text: str) -> Optional[dict]:
+def _chat_request(text: str) -> dict:
+    """Chat arguments (prompt, model, schema and options) for one document."""
+    # Prepare the prompt
+    prompt ="""Aim: To analyse the information and extract the right informations.
+           Procedure: The data given would be reframed for better understanding and then
+           the relevant data would be extracted.
+           You need to analyse the reframed data to see if the text is of a Bachelors or masters marksheet or not.
+           Also, you need to detect the student name, total_marks, university, percentage, cgpa, start year and passing year from the text. 
+           Data information: The data is extracted from images or PDFs using OCR tools.
+           NOTE: The information is extracted using OCR tool and might have mis-spelled data. You need to handle it
+           \n\n
+        """ + f"Data: {text}"
+
+    return dict(
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        model="llama3.3:70b",
+        format=bachelors_masters_marksheet,
+        options={'temperature': 0.2},
+    )
+
+
+def extract_event_information(text: str, client: Optional[LLMClient] = None) -> Optional[dict]:
     """
     Extracts event information from the input text using OpenAI's API.
     Args:
         text (str): The input text containing document information.
+        client (LLMClient): Shared Ollama client; defaults to get_llm_client().
     Returns:
         dict: Parsed document type and additional information or None if an error occurs.
     """
     try:
-        # Prepare the prompt
-        prompt ="""Aim: To analyse the information and extract the right informations.
-               Procedure: The data given would be reframed for better understanding and then
-               the relevant data would be extracted.
-               You need to analyse the reframed data to see if the text is of a Bachelors or masters marksheet or not.
-               Also, you need to detect the student name, total_marks, university, percentage, cgpa, start year and passing year from the text. 
-               Data information: The data is extracted from images or PDFs using OCR tools.
-               NOTE: The information is extracted using OCR tool and might have mis-spelled data. You need to handle it
-               \n\n
-            """ + f"Data: {text}"
+        # Send the chat request
+        response = (client or get_llm_client()).chat(**_chat_request(text))
 
+        # Parse and validate the response
+        output_json = bachelors_masters_marksheet.model_validate_json(response.message.content)
+        print("Validation successful:", output_json)
+        return output_json.dict()
 
-        # Send the chat request
-        response = chat(
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            model="llama3.3:70b",
-            format=bachelors_masters_marksheet.model_json_schema(),
-            options={'temperature': 0.2},
-        )
+    except ValidationError as ve:
+        print("Validation error:", ve)
+    except Exception as e:
+        print("An error occurred during processing:", e)
+
+    return None
+
+
+async def extract_event_information_async(text: str, client: Optional[AsyncLLMClient] = None) -> Optional[dict]:
+    """Async counterpart of extract_event_information, using an AsyncLLMClient (get_async_llm_client() by default)."""
+    try:
+        response = await (client or get_async_llm_client()).chat(**_chat_request(text))
 
         # Parse and validate the response
         output_json = bachelors_masters_marksheet.model_validate_json(response.message.content)
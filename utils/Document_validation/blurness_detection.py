@@ -1,143 +1,594 @@
 import cv2
 import numpy as np
-from skimage.feature import canny
-from skimage.filters import gaussian
 from pdf2image import convert_from_path
+import json
 import os
-import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from utils.ocr_tools.document_loader import DEFAULT_DPI, Document, as_document, grayscale_array
+from utils.Document_validation.brighten import compute_exposure_metrics, enhance_document_page
+
+# Metrics are computed on the page box-reduced by a whole factor until its long
+# side is at most this (a 300 DPI A4 page is scored at 100 DPI). A profile's
+# thresholds hold for the "max_side" it was fitted at.
+QUALITY_MAX_SIDE = 1500
+
+# Hysteresis thresholds matching skimage's canny defaults (0.1 / 0.2 of the
+# [0, 1] intensity range) on a 0-255 image.
+CANNY_LOW_THRESHOLD = 0.1 * 255
+CANNY_HIGH_THRESHOLD = 0.2 * 255
+
+# Largest value a metric can reach: edge density is a percentage, and the noise
+# level is the standard deviation of values within [-1, 255]. A profile's
+# "metric_caps" are usually far tighter.
+METRIC_UPPER_BOUNDS = {
+    "edge_density": 100.0,
+    "noise_level": 128.0,
+}
+
+# Blur map: tile edge length in pixels (at the metrics resolution; about one
+# text line at QUALITY_MAX_SIDE, so a blurred line fills whole tiles). Ink is
+# found by an adaptive threshold on a smoothed copy of the page: pixels darker
+# than the mean of their TEXT_INK_BLOCK neighbourhood by TEXT_INK_OFFSET. The
+# smoothing makes sharp and blurred strokes look alike and wipes out faint
+# background print. A tile is text with at least TEXT_TILE_MIN_INK ink and
+# gradients no more aligned than TEXT_TILE_MAX_COHERENCE (which leaves out
+# page borders and other single edges). A text tile is blurry when its
+# Laplacian standard deviation, over its brightness standard deviation, is
+# below TEXT_TILE_MIN_SHARPNESS or below TEXT_TILE_RELATIVE_SHARPNESS times
+# the page's median text tile. The text counts as unreadable when the share of
+# blurry text tiles exceeds TEXT_BLUR_FRACTION or TEXT_BLUR_MIN_TILES of them
+# touch (a blurred name or marks field on an otherwise sharp page).
+BLUR_MAP_TILE_SIZE = 16
+TEXT_INK_SIGMA = 2.0
+TEXT_INK_BLOCK = 31
+TEXT_INK_OFFSET = 10
+TEXT_TILE_MIN_INK = 0.05
+TEXT_TILE_MAX_COHERENCE = 0.95
+TEXT_TILE_MIN_SHARPNESS = 0.5
+TEXT_TILE_RELATIVE_SHARPNESS = 0.4
+TEXT_BLUR_FRACTION = 0.25
+TEXT_BLUR_MIN_TILES = 12
+
+# Thresholds, weights and metric caps of the weighted score, per input kind,
+# for metrics computed at "max_side". A metric above its cap counts as the cap,
+# so the edge and noise terms can never outweigh a low Laplacian variance and
+# a blurry page is settled after the first metric. The built-in profile holds
+# the hand-tuned values, refitted for QUALITY_MAX_SIDE; calibrate_quality.py
+# fits a replacement on a labelled corpus and writes it as JSON, picked up
+# from QUALITY_PROFILE_PATH (by default quality_profile.json next to this
+# module). Version 1 profiles were fitted at full resolution and are ignored.
+QUALITY_PROFILE_FORMAT_VERSION = 2
+QUALITY_PROFILE_PATH = os.environ.get(
+    "QUALITY_PROFILE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "quality_profile.json")
+)
+DEFAULT_QUALITY_PROFILE = {
+    "format_version": QUALITY_PROFILE_FORMAT_VERSION,
+    "name": "hand-tuned-v2",
+    "max_side": QUALITY_MAX_SIDE,
+    "pdf": {
+        "thresholds": {"laplacian": 2300, "edge_density": 10, "noise_level": 40},
+        "weights": {"laplacian": 0.8, "edge_density": 0.1, "noise_level": 0.1},
+        "metric_caps": {"edge_density": 15, "noise_level": 60},
+    },
+    "image": {
+        "thresholds": {"laplacian": 1500, "edge_density": 20, "noise_level": 40},
+        "weights": {"laplacian": 0.7, "edge_density": 0.2, "noise_level": 0.1},
+        "metric_caps": {"edge_density": 15, "noise_level": 60},
+    },
+}
+_quality_profile = None
+
+# Pages scored at the same time by process_document; each one holds a decoded
+# 300 DPI page in memory while it is being scored.
+QUALITY_MAX_WORKERS = int(os.environ.get("QUALITY_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+
+def to_grayscale(image: np.ndarray, max_side: Optional[int] = QUALITY_MAX_SIDE) -> np.ndarray:
+    """
+    Convert a BGR (or already grayscale) image to grayscale once, reduced like
+    grayscale_array by the smallest whole factor that fits ``max_side``.
+    """
+    gray_image = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    height, width = gray_image.shape
+    factor = -(-max(height, width) // max_side) if max_side else 1
+    if factor > 1:
+        gray_image = cv2.resize(gray_image, (-(-width // factor), -(-height // factor)), interpolation=cv2.INTER_AREA)
+    return gray_image
+
+
+def _laplacian_variance(gray_image: np.ndarray) -> float:
+    return float(cv2.Laplacian(gray_image, cv2.CV_64F).var())
+
+
+def _edge_density(smoothed_image: np.ndarray) -> float:
+    edges = cv2.Canny(smoothed_image, CANNY_LOW_THRESHOLD, CANNY_HIGH_THRESHOLD, L2gradient=True)
+    return cv2.countNonZero(edges) / edges.size * 100
+
+
+def _noise_level(gray_image: np.ndarray, smoothed_image: np.ndarray) -> float:
+    # skimage's gaussian() returned the blur rescaled to [0, 1] while the gray
+    # image stayed 0-255; the thresholds were tuned on that, so keep the scale.
+    noise = gray_image.astype(np.float32) - smoothed_image.astype(np.float32) / 255.0
+    return float(noise.std())
+
+
+def compute_quality_metrics(image: np.ndarray, max_side: Optional[int] = QUALITY_MAX_SIDE) -> dict:
+    """
+    Compute Laplacian variance, edge density and noise level in one pass.
+
+    The image is converted to grayscale and downsampled once, and the
+    Gaussian-smoothed copy is shared between the edge and noise metrics.
+
+    Args:
+        image: BGR or grayscale image.
+        max_side: Longest side the metrics are computed at (None for full size).
+
+    Returns:
+        A dictionary with "laplacian_var", "edge_density" and "noise_level".
+    """
+    gray_image = to_grayscale(image, max_side)
+    smoothed_image = cv2.GaussianBlur(gray_image, (0, 0), 1)
+    return {
+        "laplacian_var": _laplacian_variance(gray_image),
+        "edge_density": _edge_density(smoothed_image),
+        "noise_level": _noise_level(gray_image, smoothed_image),
+    }
 
 
 def compute_laplacian_variance(image: np.ndarray) -> float:
     """Compute the Laplacian variance of the image."""
-    gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    laplacian_var = cv2.Laplacian(gray_image, cv2.CV_64F).var()
-    return laplacian_var
+    return _laplacian_variance(to_grayscale(image))
 
 
 def compute_edge_density(image: np.ndarray) -> float:
     """Compute the edge density of the image."""
-    gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    edges = canny(gray_image)
-    edge_density = np.sum(edges) / edges.size * 100
-    return edge_density
+    return _edge_density(cv2.GaussianBlur(to_grayscale(image), (0, 0), 1))
 
 
 def compute_noise_level(image: np.ndarray) -> float:
     """Estimate the noise level of the image."""
-    gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    blurred_image = gaussian(gray_image, sigma=1)
-    noise = gray_image - blurred_image
-    noise_level = np.std(noise)
-    return noise_level
+    gray_image = to_grayscale(image)
+    return _noise_level(gray_image, cv2.GaussianBlur(gray_image, (0, 0), 1))
+
 
+def _capped(value: float, metric: str, metric_caps: Optional[dict]) -> float:
+    cap = (metric_caps or {}).get(metric)
+    return value if cap is None else min(value, cap)
 
-def classify_image_quality(laplacian_var: float, edge_density: float, noise_level: float, thresholds: dict, weights: dict) -> str:
+
+def classify_image_quality(laplacian_var: float, edge_density: float, noise_level: float, thresholds: dict, weights: dict,
+                           metric_caps: Optional[dict] = None) -> str:
     """
     Classify the image quality based on the Laplacian variance, edge density, and noise level.
+
+    Each metric is limited to its entry in ``metric_caps`` (profile keys)
+    before it is weighted.
     
     Returns:
         "Not Blurry" or "Blurry" based on the calculated score.
     """
     score = (
-        weights["laplacian"] * (laplacian_var / thresholds["laplacian"]) +
-        weights["edge_density"] * (edge_density / thresholds["edge_density"]) +
-        weights["noise_level"] * (noise_level / thresholds["noise_level"])
+        weights["laplacian"] * (_capped(laplacian_var, "laplacian", metric_caps) / thresholds["laplacian"]) +
+        weights["edge_density"] * (_capped(edge_density, "edge_density", metric_caps) / thresholds["edge_density"]) +
+        weights["noise_level"] * (_capped(noise_level, "noise_level", metric_caps) / thresholds["noise_level"])
     )
     return "Not Blurry" if score > 1 else "Blurry"
 
 
-def convert_pdf_to_image(pdf_path: str, temp_dir: str) -> np.ndarray:
+def classify_image_quality_cascade(image: np.ndarray, thresholds: dict, weights: dict,
+                                   max_side: Optional[int] = QUALITY_MAX_SIDE,
+                                   metric_caps: Optional[dict] = None) -> dict:
+    """
+    Classify image quality, computing only as many metrics as the decision needs.
+
+    Metrics are evaluated cheapest first (Laplacian variance, noise level,
+    edge density). After each one the partial score is compared with 1: once
+    it is above, the page is "Not Blurry" whatever follows (every term is
+    non-negative); once even the largest contribution the remaining metrics
+    can make (their ``metric_caps``, or METRIC_UPPER_BOUNDS without one)
+    cannot lift it above 1, the page is "Blurry". Both bounds are exact, so
+    the decision always matches classify_image_quality with the same caps.
+    With the default profile's caps a clearly blurry page is decided by the
+    Laplacian variance alone.
+
+    Returns:
+        A dictionary with the metrics (None for those skipped), "score" (the
+        partial score at the decision), "classification" and "decided_by",
+        the name of the metric after which the decision was made.
+    """
+    bounds = dict(METRIC_UPPER_BOUNDS)
+    for metric, cap in (metric_caps or {}).items():
+        if metric in bounds:
+            bounds[metric] = min(bounds[metric], cap)
+
+    def upper_bound(metric):
+        return weights[metric] * bounds[metric] / thresholds[metric]
+
+    result = {"laplacian_var": None, "edge_density": None, "noise_level": None}
+    remaining = upper_bound("noise_level") + upper_bound("edge_density")
+
+    def decide(score, stage):
+        if score > 1:
+            classification = "Not Blurry"
+        elif score + remaining <= 1:
+            classification = "Blurry"
+        else:
+            return None
+        result.update(score=score, classification=classification, decided_by=stage)
+        return result
+
+    gray_image = to_grayscale(image, max_side)
+    result["laplacian_var"] = _laplacian_variance(gray_image)
+    score = weights["laplacian"] * _capped(result["laplacian_var"], "laplacian", metric_caps) / thresholds["laplacian"]
+    if decide(score, "laplacian"):
+        return result
+
+    smoothed_image = cv2.GaussianBlur(gray_image, (0, 0), 1)
+    result["noise_level"] = _noise_level(gray_image, smoothed_image)
+    score += weights["noise_level"] * _capped(result["noise_level"], "noise_level", metric_caps) / thresholds["noise_level"]
+    remaining -= upper_bound("noise_level")
+    if decide(score, "noise_level"):
+        return result
+
+    result["edge_density"] = _edge_density(smoothed_image)
+    score += weights["edge_density"] * _capped(result["edge_density"], "edge_density", metric_caps) / thresholds["edge_density"]
+    remaining = 0.0
+    decide(score, "edge_density")
+    return result
+
+
+def _tile_sums(integral: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """Sum of the source image over every tile, from its integral image."""
+    return (integral[np.ix_(rows[1:], cols[1:])] - integral[np.ix_(rows[:-1], cols[1:])]
+            - integral[np.ix_(rows[1:], cols[:-1])] + integral[np.ix_(rows[:-1], cols[:-1])])
+
+
+def compute_blur_map(image: np.ndarray, laplacian_threshold: float, tile_size: int = BLUR_MAP_TILE_SIZE,
+                     max_side: Optional[int] = QUALITY_MAX_SIDE) -> dict:
+    """
+    Measure sharpness tile by tile and report how much of the text is blurred.
+
+    The Laplacian and the ink mask are computed once; per-tile Laplacian and
+    brightness variance and ink share then come from integral images, so the
+    cost stays linear in the number of pixels whatever the tile size. A tile
+    is sharp when its Laplacian variance reaches ``laplacian_threshold``; text
+    tiles are judged by their contrast-relative sharpness instead (see
+    TEXT_TILE_MIN_SHARPNESS), as blurred ink also loses contrast.
+
+    Args:
+        image: BGR or grayscale image.
+        laplacian_threshold: Laplacian variance a tile needs to count as sharp.
+        tile_size: Tile edge in pixels at the metrics resolution.
+        max_side: Longest side the map is computed at.
+
+    Returns:
+        A dictionary with the tile grid ("rows", "cols", "tile_size"),
+        per-tile "sharpness" (Laplacian variance) and "text_tiles" as nested
+        lists, "sharp_fraction" over all tiles, "blurry_text_fraction" over
+        text tiles (None when no text was found), "largest_blurry_text_run"
+        (tiles in the largest touching group of blurry text tiles) and
+        "text_region_blurry".
+    """
+    gray_image = to_grayscale(image, max_side)
+    height, width = gray_image.shape
+    rows = np.append(np.arange(0, height, tile_size), height)
+    cols = np.append(np.arange(0, width, tile_size), width)
+    area = np.outer(np.diff(rows), np.diff(cols)).astype(np.float64)
+
+    def tile_variance(values):
+        total, squares = cv2.integral2(values, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        mean = _tile_sums(total, rows, cols) / area
+        return np.maximum(_tile_sums(squares, rows, cols) / area - mean * mean, 0.0)
+
+    sharpness = tile_variance(cv2.Laplacian(gray_image, cv2.CV_64F))
+    contrast = np.sqrt(tile_variance(gray_image))
+
+    smoothed = cv2.GaussianBlur(gray_image, (0, 0), TEXT_INK_SIGMA)
+    ink_mask = cv2.adaptiveThreshold(smoothed, 1, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV,
+                                     TEXT_INK_BLOCK, TEXT_INK_OFFSET)
+    ink_share = _tile_sums(cv2.integral(ink_mask, sdepth=cv2.CV_32S), rows, cols) / area
+    # Coherence of the gradient directions (structure tensor): near 1 on a
+    # single straight edge such as a page border, lower on strokes of text
+    gradient_x = cv2.Sobel(gray_image, cv2.CV_64F, 1, 0)
+    gradient_y = cv2.Sobel(gray_image, cv2.CV_64F, 0, 1)
+    xx, yy, xy = (_tile_sums(cv2.integral(values, sdepth=cv2.CV_64F), rows, cols)
+                  for values in (gradient_x * gradient_x, gradient_y * gradient_y, gradient_x * gradient_y))
+    coherence = np.sqrt((xx - yy) ** 2 + 4 * xy * xy) / np.maximum(xx + yy, 1e-9)
+    text_tiles = (ink_share >= TEXT_TILE_MIN_INK) & (coherence <= TEXT_TILE_MAX_COHERENCE)
+
+    sharp_tiles = sharpness >= laplacian_threshold
+    # Contrast-relative sharpness, against a fixed floor and against the
+    # page's own text, so a blurred field stands out on a sharp page
+    text_sharpness = np.sqrt(sharpness) / np.maximum(contrast, 1.0)
+    min_sharpness = TEXT_TILE_MIN_SHARPNESS
+    if text_tiles.any():
+        min_sharpness = max(min_sharpness, TEXT_TILE_RELATIVE_SHARPNESS * float(np.median(text_sharpness[text_tiles])))
+    blurry_text_tiles = text_tiles & (text_sharpness < min_sharpness)
+    text_tile_count = int(text_tiles.sum())
+    blurry_text_fraction = float(blurry_text_tiles.sum()) / text_tile_count if text_tile_count else None
+    count, _, stats, _ = cv2.connectedComponentsWithStats(blurry_text_tiles.astype(np.uint8), connectivity=8)
+    largest_run = int(stats[1:, cv2.CC_STAT_AREA].max()) if count > 1 else 0
+    return {
+        "rows": len(rows) - 1,
+        "cols": len(cols) - 1,
+        "tile_size": tile_size,
+        "sharpness": np.round(sharpness, 1).tolist(),
+        "text_tiles": text_tiles.tolist(),
+        "sharp_fraction": float(sharp_tiles.mean()),
+        "blurry_text_fraction": blurry_text_fraction,
+        "largest_blurry_text_run": largest_run,
+        "text_region_blurry": blurry_text_fraction is not None and (
+            blurry_text_fraction > TEXT_BLUR_FRACTION or largest_run >= TEXT_BLUR_MIN_TILES
+        ),
+    }
+
+
+def convert_pdf_to_image(pdf_path: str, dpi: int = DEFAULT_DPI) -> np.ndarray:
     """
     Convert the first page of a PDF to an image.
+
+    poppler's output is read straight from its pipe, so nothing is written to
+    disk and concurrent calls share no files.
     
     Args:
         pdf_path: Path to the PDF file.
-        temp_dir: Temporary directory for storing intermediate files.
+        dpi: Resolution of the rasterized page.
 
     Returns:
         A NumPy array representing the first page of the PDF as an image.
     """
-    pages = convert_from_path(pdf_path, dpi=300, output_folder=temp_dir)
+    pages = convert_from_path(pdf_path, dpi=dpi, first_page=1, last_page=1)
     if pages:
         return np.array(pages[0])
     raise ValueError("Could not extract any pages from the PDF.")
 
 
-def process_image(file_path: str) -> dict:
+def document_page_to_grayscale(document: Document, page_index: int = 0, keep: bool = False,
+                               max_side: Optional[int] = QUALITY_MAX_SIDE, enhance: bool = False) -> tuple:
+    """
+    Take a page of a loaded Document as the reduced grayscale array the metrics use.
+
+    The page is reduced inside PIL (see grayscale_array), so scoring never
+    copies the full-size page. With ``enhance`` the exposure is measured on
+    that array; an under-exposed page is corrected and substituted on the
+    Document (see brighten.enhance_document_page) and the corrected page is
+    the one returned. With ``keep`` the page stays on the Document for later
+    stages until Document.release_pages.
+
+    Returns:
+        Tuple of (grayscale array, enhancement steps applied).
+    """
+    page = next(document.iter_pages(indices=[page_index], keep=keep))
+    gray_image = grayscale_array(page, max_side)
+    steps = []
+    if enhance:
+        steps = enhance_document_page(document, page_index, page, compute_exposure_metrics(gray_image))
+        if steps:
+            gray_image = grayscale_array(document.page(page_index), max_side)
+    return gray_image, steps
+
+
+def load_quality_profile(path: Optional[str] = None) -> dict:
+    """
+    Load a threshold profile written by calibrate_quality.py.
+
+    Args:
+        path: Profile JSON file. Defaults to QUALITY_PROFILE_PATH.
+
+    Returns:
+        The profile, or DEFAULT_QUALITY_PROFILE when no file is configured or
+        the file cannot be used.
+    """
+    path = path or QUALITY_PROFILE_PATH
+    if not path or not os.path.exists(path):
+        return DEFAULT_QUALITY_PROFILE
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            profile = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read quality profile {path}: {e}")
+        return DEFAULT_QUALITY_PROFILE
+    if profile.get("format_version") != QUALITY_PROFILE_FORMAT_VERSION:
+        print(f"Ignoring quality profile {path}: unsupported format version {profile.get('format_version')}")
+        return DEFAULT_QUALITY_PROFILE
+    return profile
+
+
+def get_quality_profile() -> dict:
+    """Return the profile blur detection uses, loading it on first use."""
+    global _quality_profile
+    if _quality_profile is None:
+        _quality_profile = load_quality_profile()
+    return _quality_profile
+
+
+def set_quality_profile(profile: Optional[dict]):
+    """Use ``profile`` from now on; None reloads QUALITY_PROFILE_PATH on next use."""
+    global _quality_profile
+    _quality_profile = profile
+
+
+def get_quality_settings(is_pdf: bool, profile: Optional[dict] = None) -> tuple:
+    """
+    Return the (thresholds, weights) used to classify a PDF page or an image.
+    """
+    settings = (profile or get_quality_profile())["pdf" if is_pdf else "image"]
+    return settings["thresholds"], settings["weights"]
+
+
+def get_quality_max_side(profile: Optional[dict] = None) -> int:
+    """Return the resolution (long side) the profile's thresholds were fitted at."""
+    return (profile or get_quality_profile()).get("max_side", QUALITY_MAX_SIDE)
+
+
+def assess_image_quality(image: np.ndarray, is_pdf: bool, full_metrics: bool = False,
+                         with_blur_map: bool = False) -> dict:
+    """
+    Classify one page image with the PDF or image settings.
+
+    Args:
+        image: Page image: BGR, or grayscale such as document_page_to_grayscale returns.
+        is_pdf: Whether the page comes from a PDF.
+        full_metrics: Compute every metric instead of stopping early.
+        with_blur_map: Also add a tiled "blur_map".
+
+    Returns:
+        The metrics and classification, as returned by process_image.
+    """
+    profile = get_quality_profile()
+    thresholds, weights = get_quality_settings(is_pdf, profile)
+    metric_caps = profile["pdf" if is_pdf else "image"].get("metric_caps")
+    gray_image = to_grayscale(image, get_quality_max_side(profile))
+    if full_metrics:
+        metrics = compute_quality_metrics(gray_image, None)
+        metrics["classification"] = classify_image_quality(
+            metrics["laplacian_var"], metrics["edge_density"], metrics["noise_level"], thresholds, weights, metric_caps
+        )
+        metrics["decided_by"] = "all"
+    else:
+        metrics = classify_image_quality_cascade(gray_image, thresholds, weights, None, metric_caps)
+
+    if with_blur_map:
+        metrics["blur_map"] = compute_blur_map(gray_image, thresholds["laplacian"], max_side=None)
+    metrics["profile"] = profile["name"]
+    return metrics
+
+
+def process_image(file_path, full_metrics: bool = False, with_blur_map: bool = False, is_pdf: bool = False) -> dict:
     """
     Process an image or PDF file and compute quality metrics.
+
+    Everything happens in memory, so any number of threads or processes can
+    call this at once.
     
     Args:
-        file_path: Path to the input image or PDF file.
+        file_path: Path to the input image or PDF file, a loaded Document
+            whose first page is reused instead of being rasterized again, or
+            a page already in memory as a BGR or grayscale NumPy array.
+        full_metrics: Compute every metric instead of stopping as soon as the
+            classification is certain.
+        with_blur_map: Also add a tiled "blur_map" (see compute_blur_map).
+        is_pdf: For an in-memory array, whether to use the PDF thresholds.
 
     Returns:
         A dictionary with computed metrics and classification results.
+        "decided_by" names the metric that settled the classification;
+        metrics that were not needed are None.
     """
-    temp_dir = None
-    try:
-        if file_path.lower().endswith(".pdf"):
-            temp_dir = "./temp_pdf_conversion"
-            os.makedirs(temp_dir, exist_ok=True)
-            image = convert_pdf_to_image(file_path, temp_dir)
-            thresholds = {
-                "laplacian": 190,
-                "edge_density": 2.0,
-                "noise_level": 50
-            }
-            weights = {
-                "laplacian": 0.8,
-                "edge_density": 0.1,
-                "noise_level": 0.1
-            }
-        else:
-            image = cv2.imread(file_path)
-            if image is None:
-                raise ValueError("Invalid image file provided.")
-            thresholds = {
-                "laplacian": 1000,
-                "edge_density": 12,
-                "noise_level": 5000,
-            }
-            weights = {
-                "laplacian": 0.5,
-                "edge_density": 0.3,
-                "noise_level": 0.2,
-            }
-
-        laplacian_var = compute_laplacian_variance(image)
-        edge_density = compute_edge_density(image)
-        noise_level = compute_noise_level(image)
-
-        classification = classify_image_quality(laplacian_var, edge_density, noise_level, thresholds, weights)
-        return {
-            "laplacian_var": laplacian_var,
-            "edge_density": edge_density,
-            "noise_level": noise_level,
-            "classification": classification,
-        }
-    finally:
-        if temp_dir and os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-
-
-def blur_detection(file_path: str) -> bool:
+    if isinstance(file_path, np.ndarray):
+        image = file_path
+    else:
+        document = as_document(file_path)
+        is_pdf = document.is_pdf
+        image, _ = document_page_to_grayscale(document, 0, keep=isinstance(file_path, Document),
+                                              max_side=get_quality_max_side())
+
+    return assess_image_quality(image, is_pdf, full_metrics, with_blur_map)
+
+
+def process_document(file_path, max_workers: int = QUALITY_MAX_WORKERS, full_metrics: bool = False,
+                     with_blur_map: bool = False, pages: Optional[list] = None, keep: bool = False,
+                     enhance: bool = False) -> dict:
     """
-    Main function to detect if a file is blurry.
-    
+    Score every page of a document and aggregate the results.
+
+    Pages are rasterized and scored in parallel by at most ``max_workers``
+    threads, so no more than that many pages are decoded at once. Pages an
+    earlier stage already rasterized on the Document are reused; the others
+    are streamed and dropped once scored, unless ``keep`` is set for a caller
+    that OCRs them next. Born-digital PDF pages (with a usable text layer) are
+    "Not Blurry" without being rasterized. A page that cannot be read is
+    reported with classification "Error" and counts as unreadable.
+
     Args:
-        file_path: Path to the input file (image or PDF).
+        file_path: Path to the input image or PDF file, or a loaded Document.
+        max_workers: Largest number of pages processed at the same time.
+        full_metrics: Compute every metric on each page.
+        with_blur_map: Add a tiled "blur_map" to each page.
+        pages: 0-based pages to score. Defaults to all pages.
+        keep: Keep the scored pages on the Document for the next stage; the
+            caller frees them with Document.release_pages.
+        enhance: Correct under-exposed pages before scoring them, so the gate
+            judges the page OCR will read (see document_page_to_grayscale).
+            Corrected pages stay on the Document until released.
 
     Returns:
-        True if the file is classified as "Blurry", otherwise False.
+        A dictionary with "pages" (per-page metrics, each with its 1-based
+        "page" and, for corrected pages, the "enhancement" steps),
+        "page_count", "blurry_pages" (page numbers classified "Blurry" or
+        "Error") and "classification", which is "Blurry" when any page is.
     """
-    result = process_image(file_path)
-    #print(f"Image Quality Analysis: {result}")
+    document = as_document(file_path)
+    indices = list(range(document.page_count)) if pages is None else list(pages)
+    max_side = get_quality_max_side()
+
+    def assess_page(page_index):
+        try:
+            if document.text_layer(page_index) is not None:
+                return {"page": page_index + 1, "classification": "Not Blurry", "decided_by": "text_layer"}
+            image, steps = document_page_to_grayscale(document, page_index, keep, max_side, enhance)
+            metrics = assess_image_quality(image, document.is_pdf, full_metrics, with_blur_map)
+            if steps:
+                metrics["enhancement"] = steps
+        except Exception as e:
+            print(f"Could not assess page {page_index + 1} of {document.path}: {e}")
+            metrics = {"classification": "Error", "error": str(e)}
+        metrics["page"] = page_index + 1
+        return metrics
+
+    workers = max(1, min(max_workers, len(indices)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page-quality") as executor:
+        pages = list(executor.map(assess_page, indices))
+
+    blurry_pages = [page["page"] for page in pages if page["classification"] != "Not Blurry"]
+    return {
+        "pages": pages,
+        "page_count": len(pages),
+        "blurry_pages": blurry_pages,
+        "classification": "Blurry" if blurry_pages else "Not Blurry",
+    }
+
+
+def is_page_blurry(result: dict, text_regions: bool = False) -> bool:
+    """
+    Decide on one process_image / process_document page result.
+
+    With ``text_regions`` the blur map's text tiles decide when there are any.
+    """
+    if text_regions and result.get("blur_map") and result["blur_map"]["blurry_text_fraction"] is not None:
+        return result["blur_map"]["text_region_blurry"]
     if result['classification'] == 'Not Blurry':
         return False
     else:
         return True
 
 
+def blur_detection(file_path, text_regions: bool = False, all_pages: bool = False) -> bool:
+    """
+    Main function to detect if a file is blurry.
+    
+    Args:
+        file_path: Path to the input file (image or PDF), a loaded Document,
+            or an in-memory image array (scored with the image-file settings).
+        text_regions: Judge by the text tiles of the blur map rather than the
+            whole page, so a blurred logo does not reject sharp text and a
+            blurred name or marks region is not hidden by a sharp page.
+            Falls back to the page score when no text tiles are found.
+        all_pages: Check every page instead of the first one; the file is
+            blurry when any page is.
+
+    Returns:
+        True if the file is classified as "Blurry", otherwise False.
+    """
+    if all_pages:
+        report = process_document(file_path, with_blur_map=text_regions)
+        return any(is_page_blurry(page, text_regions) for page in report["pages"])
+    result = process_image(file_path, with_blur_map=text_regions)
+    #print(f"Image Quality Analysis: {result}")
+    return is_page_blurry(result, text_regions)
+
+
 if __name__ == "__main__":
     # Provide the path to an image or PDF
     file_path = "/home/rohit/document_OCR/images/35140083-41a2-4284-b8a0-e11e42af2600.jpg"
@@ -1,6 +1,27 @@
+import threading
+from typing import Iterable, Optional
 import cv2
 import numpy as np
 from pdf2image import convert_from_path
+from utils.ocr_tools.document_loader import Document, grayscale_array
+
+# A page whose median brightness (its paper) is below this is under-exposed.
+# Well-lit scans sit above 200; gasbillblur.jpeg-style photos around 160.
+UNDEREXPOSED_PAPER_LEVEL = 185
+# Where the enhancement moves the paper to, and the flattest gamma allowed
+TARGET_PAPER_LEVEL = 225
+MIN_GAMMA = 0.4
+# Below this p95-p5 brightness range a page also gets CLAHE
+LOW_CONTRAST_RANGE = 100
+CLAHE_CLIP_LIMIT = 2.0
+CLAHE_TILE_GRID = (8, 8)
+# Recorded on enhanced pages and in their OCR cache keys; bump when the recipe changes
+ENHANCEMENT_VARIANT = "enhanced-v1"
+# Exposure is measured on the page reduced to this long side; the histogram
+# percentiles barely move, and no full-size copy is made for pages left alone
+EXPOSURE_MAX_SIDE = 1500
+
+_thread_state = threading.local()
 
 def convert_pdf_to_image(pdf_path: str, dpi: int = 300) -> np.ndarray:
     """
@@ -13,50 +34,198 @@ def convert_pdf_to_image(pdf_path: str, dpi: int = 300) -> np.ndarray:
     Returns:
         np.ndarray: Image converted from the first page of the PDF.
     """
-    pages = convert_from_path(pdf_path, dpi=dpi)
+    pages = convert_from_path(pdf_path, dpi=dpi, first_page=1, last_page=1)
     if pages:
         return np.array(pages[0])  # Convert the first page to a NumPy array
     raise ValueError("Could not extract any pages from the PDF")
 
 
-def brighten_image(image: np.ndarray, brightness_factor: float = 1.2) -> np.ndarray:
+def brighten_image(image: np.ndarray, brightness_factor: float = 1.2, inplace: bool = False) -> np.ndarray:
     """
     Brighten an image by scaling its pixel values.
 
+    The scaling is precomputed for the 256 possible values and applied as a
+    lookup table, so no float copy of the image is made.
+
     Args:
         image (np.ndarray): Input image in BGR format (as read by OpenCV or converted from PDF).
         brightness_factor (float): Factor by which to increase brightness. Default is 1.2.
+        inplace (bool): Overwrite ``image`` instead of returning a new array.
 
     Returns:
         np.ndarray: Brightened image.
     """
     if not isinstance(image, np.ndarray):
         raise ValueError("Input must be a NumPy array representing the image.")
-    
-    # Convert image to float32 to avoid overflow during multiplication
-    image_float = image.astype(np.float32)
-    
-    # Scale pixel values by the brightness factor
-    brightened_image = image_float * brightness_factor
-    
-    # Clip pixel values to valid range [0, 255] and convert back to uint8
-    brightened_image = np.clip(brightened_image, 0, 255).astype(np.uint8)
-    
-    return brightened_image
+    if image.dtype != np.uint8:
+        image = np.clip(image, 0, 255).astype(np.uint8)
+        inplace = True
+
+    # Same rounding as scaling in float32, clipping and truncating to uint8
+    lut = np.clip(np.arange(256, dtype=np.float32) * brightness_factor, 0, 255).astype(np.uint8)
+    return cv2.LUT(image, lut, dst=image if inplace else None)
+
+
+def compute_exposure_metrics(image: np.ndarray) -> dict:
+    """
+    Summarise the brightness distribution of an image from its histogram.
+
+    Args:
+        image (np.ndarray): RGB/BGR or grayscale uint8 image.
+
+    Returns:
+        dict: "mean", the 5th, 50th and 95th brightness percentiles ("p5",
+        "paper_level", "white_point"; on a document the median is the paper)
+        and "contrast_range" (p95 - p5).
+    """
+    gray_image = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    histogram = cv2.calcHist([gray_image], [0], None, [256], [0, 256]).ravel()
+    cumulative = np.cumsum(histogram) / histogram.sum()
+    p5, p50, p95 = (int(v) for v in np.searchsorted(cumulative, (0.05, 0.5, 0.95)))
+    return {
+        "mean": float(np.dot(histogram, np.arange(256)) / histogram.sum()),
+        "p5": p5,
+        "paper_level": p50,
+        "white_point": p95,
+        "contrast_range": p95 - p5,
+    }
+
+
+def is_underexposed(exposure: dict) -> bool:
+    """Whether the paper of a document page is too dark for reliable OCR."""
+    return exposure["paper_level"] < UNDEREXPOSED_PAPER_LEVEL
+
+
+def exposure_lut(exposure: dict) -> np.ndarray:
+    """
+    Build one 256-entry table that stretches the white point to 255 and then
+    applies the gamma that brings the paper to TARGET_PAPER_LEVEL.
+    """
+    white_point = max(exposure["white_point"], exposure["paper_level"] + 1, 1)
+    values = np.clip(np.arange(256, dtype=np.float64) / white_point, 0, 1)
+    paper = min(exposure["paper_level"] / white_point, 0.999)
+    gamma = np.log(TARGET_PAPER_LEVEL / 255) / np.log(paper) if paper > 0 else 1.0
+    return np.round(255 * values ** max(gamma, MIN_GAMMA)).astype(np.uint8)
+
+
+def enhance_image(image: np.ndarray, exposure: dict = None, inplace: bool = False) -> tuple:
+    """
+    Correct an under-exposed document image for OCR; leave other images alone.
+
+    Exposure (white-point stretch and gamma) is one lookup table applied to
+    the uint8 pixels. When the page is also flat, CLAHE is run on the
+    lightness channel to restore local contrast between ink and paper.
+
+    Args:
+        image (np.ndarray): RGB uint8 image.
+        exposure (dict): compute_exposure_metrics of the image, if already known.
+        inplace (bool): Overwrite ``image`` instead of returning a new array.
+
+    Returns:
+        tuple: (image, steps) where steps lists the corrections applied
+        ("exposure", "clahe"); an empty list means the image was returned
+        unchanged.
+    """
+    exposure = exposure or compute_exposure_metrics(image)
+    if not is_underexposed(exposure):
+        return image, []
+
+    image = cv2.LUT(image, exposure_lut(exposure), dst=image if inplace else None)
+    steps = ["exposure"]
+    if exposure["contrast_range"] < LOW_CONTRAST_RANGE:
+        lab_image = cv2.cvtColor(image, cv2.COLOR_RGB2LAB)
+        lightness = lab_image[:, :, 0].copy()
+        _get_clahe().apply(lightness, dst=lightness)
+        lab_image[:, :, 0] = lightness
+        cv2.cvtColor(lab_image, cv2.COLOR_LAB2RGB, dst=image)
+        steps.append("clahe")
+    return image, steps
+
+
+def _get_clahe():
+    clahe = getattr(_thread_state, "clahe", None)
+    if clahe is None:
+        # CLAHE objects are not safe to share between threads
+        clahe = cv2.createCLAHE(clipLimit=CLAHE_CLIP_LIMIT, tileGridSize=CLAHE_TILE_GRID)
+        _thread_state.clahe = clahe
+    return clahe
+
+
+def enhance_document_page(document: Document, index: int, page=None, exposure: dict = None) -> list:
+    """
+    Correct one page of a Document if it is under-exposed.
+
+    A corrected page is substituted on the Document (see
+    Document.replace_page), so both OCR engines read it and the OCR cache
+    keeps its results apart; it stays there until Document.release_pages.
+
+    Args:
+        document (Document): Loaded document.
+        index (int): 0-based page.
+        page (PIL.Image.Image): The page, if the caller already holds it.
+        exposure (dict): compute_exposure_metrics of the page, if already known
+            (a reduced grayscale copy is enough).
+
+    Returns:
+        list: Steps applied; empty when the page was left alone.
+    """
+    if page is None:
+        page = next(document.iter_pages(indices=[index]))
+    exposure = exposure or compute_exposure_metrics(grayscale_array(page, EXPOSURE_MAX_SIDE))
+    if not is_underexposed(exposure):
+        return []
+    image, steps = enhance_image(np.array(page.convert("RGB")), exposure, inplace=True)
+    document.replace_page(index, image, ENHANCEMENT_VARIANT)
+    return steps
+
+
+def enhance_document_pages(document: Document, pages: Optional[Iterable[int]] = None, keep: bool = False) -> dict:
+    """
+    Enhancement stage: correct the under-exposed pages of a Document before OCR.
+
+    Each page is checked from the histogram of a reduced grayscale copy; only
+    under-exposed pages are corrected and substituted on the Document. Born-
+    digital pages are skipped. The blur gate can do the same while it scores
+    pages (process_document(enhance=True)), which avoids decoding them here.
+
+    Args:
+        document (Document): Loaded document.
+        pages (Iterable[int]): 0-based pages to check. Default is all pages.
+        keep (bool): Keep the pages left alone too, so the OCR that follows
+            reuses them instead of rasterizing them again.
+
+    Returns:
+        dict: {page number (1-based): steps applied} for the pages that were enhanced.
+    """
+    indices = range(document.page_count) if pages is None else pages
+    indices = [index for index in indices if document.text_layer(index) is None]
+    enhanced = {}
+    for index, page in zip(indices, document.iter_pages(indices=indices, keep=keep)):
+        steps = enhance_document_page(document, index, page)
+        if steps:
+            enhanced[index + 1] = steps
+    if enhanced:
+        print(f"Enhanced under-exposed pages of {document.path}: {enhanced}")
+    return enhanced
 
 
-def process_file(file_path: str, brightness_factor: float = 1.2) -> np.ndarray:
+def process_file(file_path, brightness_factor: float = 1.2) -> np.ndarray:
     """
     Process a file (image or PDF) to brighten its content.
 
     Args:
-        file_path (str): Path to the input file (image or PDF).
+        file_path (str | Document): Path to the input file (image or PDF), or a
+            loaded Document whose first page is reused.
         brightness_factor (float): Factor by which to increase brightness. Default is 1.2.
 
     Returns:
         np.ndarray: Brightened image.
     """
-    if file_path.lower().endswith(".pdf"):
+    if isinstance(file_path, Document):
+        image = file_path.page_array(0)
+        if not file_path.is_pdf:
+            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    elif file_path.lower().endswith(".pdf"):
         image = convert_pdf_to_image(file_path)
     else:
         image = cv2.imread(file_path)
@@ -0,0 +1,332 @@
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+import numpy as np
+from utils.ocr_tools.document_loader import find_documents, load_document
+from utils.Document_validation.blurness_detection import (
+    METRIC_UPPER_BOUNDS,
+    QUALITY_MAX_WORKERS,
+    QUALITY_PROFILE_FORMAT_VERSION,
+    QUALITY_PROFILE_PATH,
+    get_quality_max_side,
+    load_quality_profile,
+    process_document,
+)
+
+# Outcome log appended to by record_validation_outcome (disabled when unset)
+QUALITY_OUTCOME_LOG = os.environ.get("QUALITY_OUTCOME_LOG")
+# Calibration mode: documents the quality gate rejects still go through OCR and
+# validation (and are still rejected), so the log also labels the gate's rejects
+QUALITY_CALIBRATION_MODE = os.environ.get("QUALITY_CALIBRATION_MODE", "0").lower() not in ("0", "false", "no")
+
+# Profile keys and the matching compute_quality_metrics keys, in column order
+PROFILE_METRICS = ("laplacian", "edge_density", "noise_level")
+METRIC_COLUMNS = ("laplacian_var", "edge_density", "noise_level")
+
+# Weight grid resolution; weights are non-negative and sum to 1
+WEIGHT_STEP = 0.05
+DEFAULT_TARGET_FALSE_REJECT_RATE = 0.02
+# Used for outcomes that were logged without timings
+DEFAULT_OCR_SECONDS = 20.0
+DEFAULT_LLM_SECONDS = 30.0
+# Edge density and noise are capped at this multiple of their median on readable
+# pages, which lets the cascade settle blurry pages on the Laplacian variance
+METRIC_CAP_FACTOR = 1.5
+CAPPED_METRICS = ("edge_density", "noise_level")
+
+
+def record_validation_outcome(file_path: str, validation_failed: bool, ocr_seconds: float, llm_seconds: float,
+                              log_path: Optional[str] = None, gated: bool = False):
+    """
+    Append how a document fared downstream to the outcome log.
+
+    Args:
+        file_path: The document that went through OCR and validation.
+        validation_failed: Whether validation produced no usable result.
+        ocr_seconds: Time spent on OCR.
+        llm_seconds: Time spent on LLM calls.
+        log_path: JSONL file to append to. Defaults to QUALITY_OUTCOME_LOG;
+            nothing is written when neither is set.
+        gated: Whether the quality gate rejected the document (only seen in
+            calibration mode, where rejected documents are still processed).
+    """
+    log_path = log_path or QUALITY_OUTCOME_LOG
+    if not log_path:
+        return
+    entry = {
+        "path": os.path.abspath(file_path),
+        "validation_failed": bool(validation_failed),
+        "ocr_seconds": round(ocr_seconds, 3),
+        "llm_seconds": round(llm_seconds, 3),
+        "gated": bool(gated),
+    }
+    try:
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        print(f"Could not record validation outcome to {log_path}: {e}")
+
+
+def load_outcomes(log_path: str) -> dict:
+    """
+    Read an outcome log into {absolute path: outcome}.
+
+    Each line is a JSON object with "path" and "validation_failed", and
+    optionally "ocr_seconds", "llm_seconds" and "gated" (which does not
+    change the label). A "readable" field, if given,
+    overrides the label derived from "validation_failed". Later lines for the
+    same path replace earlier ones.
+    """
+    outcomes = {}
+    base_dir = os.path.dirname(os.path.abspath(log_path))
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            path = entry["path"] if os.path.isabs(entry["path"]) else os.path.join(base_dir, entry["path"])
+            readable = entry.get("readable", not entry.get("validation_failed", False))
+            outcomes[os.path.abspath(path)] = {
+                "readable": bool(readable),
+                "cost": float(entry.get("ocr_seconds", DEFAULT_OCR_SECONDS))
+                        + float(entry.get("llm_seconds", DEFAULT_LLM_SECONDS)),
+            }
+    return outcomes
+
+
+def measure_document(file_path: str) -> dict:
+    """
+    Compute the full quality metrics of every page that blur detection scores.
+
+    Pages go through the gate's own pipeline (process_document with
+    enhance=True): under-exposed pages are corrected first and every page is
+    reduced to the profile's resolution (see get_quality_max_side), so the
+    fitted thresholds and caps hold for exactly what the gate scores.
+    Born-digital pages are left out, as blur detection never rasterizes them.
+
+    Returns:
+        A dictionary with "is_pdf" and "pages", a list of metric dictionaries.
+
+    Raises:
+        ValueError: When a page could not be read.
+    """
+    document = load_document(file_path)
+    # Documents are already measured in parallel by calibrate()
+    report = process_document(document, max_workers=1, full_metrics=True, enhance=True)
+    document.release_pages(range(document.page_count))
+    pages = []
+    for page in report["pages"]:
+        if page["classification"] == "Error":
+            raise ValueError(f"page {page['page']} could not be read: {page['error']}")
+        if page.get("decided_by") != "text_layer":
+            pages.append(page)
+    return {"is_pdf": document.is_pdf, "pages": pages}
+
+
+def _weight_grid(step: float) -> np.ndarray:
+    steps = int(round(1 / step))
+    grid = [
+        (a, b, steps - a - b)
+        for a in range(steps + 1)
+        for b in range(steps + 1 - a)
+    ]
+    return np.array(grid, dtype=np.float64) / steps
+
+
+def _apply_caps(page_metrics: np.ndarray, metric_caps: Optional[dict]) -> np.ndarray:
+    caps = [(metric_caps or {}).get(name, np.inf) for name in PROFILE_METRICS]
+    return np.minimum(page_metrics, caps)
+
+
+def _evaluate(doc_scores: np.ndarray, cut: float, readable: np.ndarray, costs: np.ndarray) -> dict:
+    rejected = doc_scores <= cut
+    unreadable = ~readable
+    return {
+        "false_reject_rate": float((rejected & readable).sum() / max(1, readable.sum())),
+        "unreadable_rejected": int((rejected & unreadable).sum()),
+        "unreadable_accepted": int((~rejected & unreadable).sum()),
+        "wasted_seconds": float(costs[~rejected & unreadable].sum()),
+    }
+
+
+def fit_settings(page_metrics: np.ndarray, page_documents: np.ndarray, readable: np.ndarray, costs: np.ndarray,
+                 target_false_reject_rate: float, weight_step: float = WEIGHT_STEP) -> dict:
+    """
+    Fit thresholds, weights and metric caps for one input kind (PDF pages or
+    image files).
+
+    Edge density and noise are first capped at METRIC_CAP_FACTOR times their
+    median on readable pages; the caps go into the profile, so blur detection
+    scores exactly what was fitted and its cascade stays exact. A document is
+    rejected when its worst page scores at most 1, with the score
+    sum(weight * capped metric / threshold). Writing each threshold as
+    scale * cut, where scale is the median of the metric on readable pages,
+    the score is below 1 exactly when sum(weight * capped metric / scale) is
+    below cut. For every weight combination on the grid the cut is set as
+    high as the target false-reject rate allows, and the combination that
+    leaves the least OCR+LLM time spent on unreadable documents wins.
+
+    Args:
+        page_metrics: (pages, 3) metrics in METRIC_COLUMNS order.
+        page_documents: Document index of each page, non-decreasing.
+        readable: Per-document label.
+        costs: Per-document OCR+LLM seconds.
+        target_false_reject_rate: Largest share of readable documents that
+            may be rejected.
+        weight_step: Resolution of the weight grid.
+
+    Returns:
+        A dictionary with "thresholds", "weights" and "metric_caps" for the
+        profile and the achieved "calibration" statistics.
+    """
+    readable_pages = readable[page_documents]
+    scale = np.median(page_metrics[readable_pages], axis=0) if readable_pages.any() else np.median(page_metrics, axis=0)
+    scale = np.maximum(scale, 1e-6)
+    metric_caps = {
+        name: float(min(METRIC_UPPER_BOUNDS[name], METRIC_CAP_FACTOR * scale[PROFILE_METRICS.index(name)]))
+        for name in CAPPED_METRICS
+    }
+    page_metrics = _apply_caps(page_metrics, metric_caps)
+
+    weights = _weight_grid(weight_step)
+    page_scores = (page_metrics / scale) @ weights.T
+    starts = np.flatnonzero(np.r_[True, page_documents[1:] != page_documents[:-1]])
+    doc_scores = np.minimum.reduceat(page_scores, starts, axis=0)
+
+    allowed_rejects = int(np.floor(target_false_reject_rate * readable.sum()))
+    best = None
+    for g in range(len(weights)):
+        scores = doc_scores[:, g]
+        readable_scores = np.sort(scores[readable])
+        if len(readable_scores) > allowed_rejects:
+            critical = readable_scores[allowed_rejects]
+            below = scores[scores < critical]
+            cut = (critical + below.max()) / 2 if len(below) else critical / 2
+        else:
+            cut = scores.max() + 1
+        cut = max(float(cut), 1e-9)
+        result = _evaluate(scores, cut, readable, costs)
+        key = (result["wasted_seconds"], result["false_reject_rate"])
+        if best is None or key < best[0]:
+            best = (key, g, cut, result)
+
+    _, g, cut, result = best
+    thresholds = {name: float(scale[i] * cut) for i, name in enumerate(PROFILE_METRICS)}
+    return {
+        "thresholds": thresholds,
+        "weights": {name: float(weights[g, i]) for i, name in enumerate(PROFILE_METRICS)},
+        "metric_caps": metric_caps,
+        "calibration": dict(result, documents=int(len(readable)), readable=int(readable.sum())),
+    }
+
+
+def evaluate_settings(page_metrics: np.ndarray, page_documents: np.ndarray, readable: np.ndarray,
+                      costs: np.ndarray, settings: dict) -> dict:
+    """Report how existing thresholds, weights and caps do on the same corpus."""
+    coefficients = np.array([settings["weights"][name] / settings["thresholds"][name] for name in PROFILE_METRICS])
+    page_scores = _apply_caps(page_metrics, settings.get("metric_caps")) @ coefficients
+    starts = np.flatnonzero(np.r_[True, page_documents[1:] != page_documents[:-1]])
+    return _evaluate(np.minimum.reduceat(page_scores, starts), 1.0, readable, costs)
+
+
+def calibrate(outcomes: dict, target_false_reject_rate: float = DEFAULT_TARGET_FALSE_REJECT_RATE,
+              max_workers: int = QUALITY_MAX_WORKERS, weight_step: float = WEIGHT_STEP) -> dict:
+    """
+    Measure every labelled document and fit a new threshold profile.
+
+    Args:
+        outcomes: Labels as returned by load_outcomes.
+        target_false_reject_rate: Largest share of readable documents the
+            gate may reject, per input kind.
+        max_workers: Documents measured at the same time.
+        weight_step: Resolution of the weight grid.
+
+    Returns:
+        A profile for blurness_detection. Each kind also carries its
+        calibration statistics and those of the profile it replaces.
+    """
+    paths = sorted(outcomes)
+
+    def measure(path):
+        try:
+            return measure_document(path)
+        except Exception as e:
+            print(f"Skipping {path}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        measurements = list(executor.map(measure, paths))
+    print(f"Measured {sum(m is not None for m in measurements)} of {len(paths)} labelled documents")
+
+    current = load_quality_profile()
+    profile = {
+        "format_version": QUALITY_PROFILE_FORMAT_VERSION,
+        "name": "calibrated-" + datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target_false_reject_rate": target_false_reject_rate,
+        "previous_profile": current["name"],
+        "max_side": get_quality_max_side(current),
+    }
+    for kind, is_pdf in (("pdf", True), ("image", False)):
+        page_metrics, page_documents, readable, costs = [], [], [], []
+        for path, measurement in zip(paths, measurements):
+            if measurement is None or measurement["is_pdf"] != is_pdf or not measurement["pages"]:
+                continue
+            for page in measurement["pages"]:
+                page_metrics.append([page[column] for column in METRIC_COLUMNS])
+                page_documents.append(len(readable))
+            readable.append(outcomes[path]["readable"])
+            costs.append(outcomes[path]["cost"])
+
+        readable = np.array(readable, dtype=bool)
+        if readable.all() or not readable.any():
+            print(f"Not enough labelled {kind} documents (need readable and unreadable ones); keeping {current['name']}")
+            profile[kind] = current[kind]
+            continue
+        page_metrics = np.array(page_metrics, dtype=np.float64)
+        page_documents = np.array(page_documents)
+        costs = np.array(costs, dtype=np.float64)
+        profile[kind] = fit_settings(page_metrics, page_documents, readable, costs,
+                                     target_false_reject_rate, weight_step)
+        profile[kind]["calibration"]["previous"] = evaluate_settings(
+            page_metrics, page_documents, readable, costs, current[kind]
+        )
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit blur-detection thresholds on a labelled corpus.")
+    parser.add_argument("outcomes", help="JSONL outcome log (see record_validation_outcome)")
+    parser.add_argument("--corpus", default=None,
+                        help="Only use documents under this directory and list the unlabelled ones")
+    parser.add_argument("--target-frr", type=float, default=DEFAULT_TARGET_FALSE_REJECT_RATE,
+                        help="Largest share of readable documents that may be rejected")
+    parser.add_argument("--output", default=QUALITY_PROFILE_PATH, help="Where to write the profile")
+    parser.add_argument("--workers", type=int, default=QUALITY_MAX_WORKERS)
+    args = parser.parse_args()
+
+    outcomes = load_outcomes(args.outcomes)
+    if args.corpus:
+        corpus = find_documents(args.corpus)
+        unlabelled = [path for path in corpus if path not in outcomes]
+        if unlabelled:
+            print(f"{len(unlabelled)} documents in {args.corpus} have no outcome:")
+            for path in unlabelled:
+                print("  ", path)
+        outcomes = {path: outcomes[path] for path in corpus if path in outcomes}
+
+    profile = calibrate(outcomes, args.target_frr, args.workers)
+    if not any("calibration" in profile[kind] for kind in ("pdf", "image")):
+        raise SystemExit(f"Nothing was fitted; {args.output} is left unchanged")
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    print(f"Wrote profile {profile['name']} to {args.output}")
+    for kind in ("pdf", "image"):
+        print(kind, json.dumps(profile[kind].get("calibration", "unchanged")))
+
+
+if __name__ == "__main__":
+    main()
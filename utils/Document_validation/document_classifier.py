@@ -0,0 +1,168 @@
+from pydantic import BaseModel, Field, ValidationError, create_model
+from typing import Annotated, Literal, Optional, Union
+from utils.llm_client import AsyncLLMClient, LLMClient, get_async_llm_client, get_llm_client
+from utils.Document_validation.academic_certificate import academic_certificate
+from utils.Document_validation.achievement_certificate import achievement_certificate
+from utils.Document_validation.admission_letter import admission_letter
+from utils.Document_validation.bachelors_marksheet import bachelors_marksheet
+from utils.Document_validation.bachelors_masters_marksheet import bachelors_masters_marksheet
+from utils.Document_validation.bank_passbook_details import bank_passbook
+from utils.Document_validation.college_digital_platform import college_digital_platform
+from utils.Document_validation.death_certificate import death_certificate
+from utils.Document_validation.disability_certificate import disability_certificate
+from utils.Document_validation.electricity_bill import electricity_bill
+from utils.Document_validation.fee_receipt import fee_receipt
+from utils.Document_validation.fee_structure import fee_structure
+from utils.Document_validation.gas_bill import gas_bill
+from utils.Document_validation.hsc_marksheet import hsc_marksheet
+from utils.Document_validation.income_certificate import annual_income
+from utils.Document_validation.masters_marksheet import masters_marksheet
+from utils.Document_validation.orphan_certificate_govt import orphanage_certificate_govt
+from utils.Document_validation.orphan_certificate_institution import orphanage_certificate_institute
+from utils.Document_validation.passport import passport
+from utils.Document_validation.ration_card import ration_card
+from utils.Document_validation.rent_receipt import rent_receipt
+from utils.Document_validation.ssc_marksheet import ssc_marksheet
+from utils.Document_validation.voter_card import voter_card
+
+# Every supported document type: (model of its validator, description for the prompt).
+# Some validators share a document_type value (fee_receipt/fee_structure,
+# masters/bachelors marksheet, the two orphan certificates, voter_card/passport),
+# so the classifier uses these keys, which are unique, as the type names.
+DOCUMENT_TYPES = {
+    "academic_certificate": (academic_certificate, "Academic certificate issued to a student"),
+    "achievement_certificate": (achievement_certificate, "Certificate of achievement, merit or participation"),
+    "admission_letter": (admission_letter, "Letter confirming a student's admission to a school or college"),
+    "bachelors_marksheet": (bachelors_marksheet, "Bachelor's degree marksheet or grade card"),
+    "bachelors_or_masters_marksheet": (bachelors_masters_marksheet, "Consolidated bachelor's/master's marksheet with totals, CGPA and years"),
+    "bank_passbook": (bank_passbook, "Bank passbook or account details page"),
+    "college_digital_platform": (college_digital_platform, "Student record printed from a college's online portal"),
+    "death_certificate": (death_certificate, "Death certificate"),
+    "disability_certificate": (disability_certificate, "Disability certificate"),
+    "electricity_bill": (electricity_bill, "Electricity bill"),
+    "fee_receipt": (fee_receipt, "Receipt for fees paid to a school or college"),
+    "fee_structure": (fee_structure, "Fee structure or fee schedule of a school or college"),
+    "gas_bill": (gas_bill, "Gas bill"),
+    "hsc_marksheet": (hsc_marksheet, "Higher Secondary (class 12) marksheet"),
+    "income_certificate": (annual_income, "Income certificate stating annual income"),
+    "masters_marksheet": (masters_marksheet, "Master's degree marksheet or grade card"),
+    "orphan_certificate_govt": (orphanage_certificate_govt, "Orphan certificate issued by a government authority"),
+    "orphan_certificate_institution": (orphanage_certificate_institute, "Orphan certificate issued by an orphanage or institution"),
+    "passport": (passport, "Passport"),
+    "ration_card": (ration_card, "Ration card"),
+    "rent_receipt": (rent_receipt, "Rent receipt"),
+    "ssc_marksheet": (ssc_marksheet, "Secondary School (class 10) marksheet or grade sheet"),
+    "voter_card": (voter_card, "Voter ID card"),
+}
+
+
+class other_document(BaseModel):
+    document_type: Literal["other_document"]
+
+
+def _variant(document_type: str, model: type) -> type:
+    # The validator's model with document_type narrowed to this one type, so
+    # the value alone tells which branch of the union the answer belongs to
+    return create_model(f"{document_type}_document", __base__=model, document_type=(Literal[document_type], ...))
+
+
+DOCUMENT_MODELS = {
+    document_type: _variant(document_type, model) for document_type, (model, _) in DOCUMENT_TYPES.items()
+}
+DOCUMENT_MODELS["other_document"] = other_document
+
+
+# Define the data model
+class DocumentClassification(BaseModel):
+    document: Annotated[Union[tuple(DOCUMENT_MODELS.values())], Field(discriminator="document_type")]
+
+
+def _chat_request(formatted_text: str) -> dict:
+    """Chat arguments (prompt, model, schema and options) for one document."""
+    type_list = "\n".join(
+        f"  - {document_type}: {description}" for document_type, (_, description) in DOCUMENT_TYPES.items()
+    )
+    # Prepare the prompt
+    prompt = """
+Aim: To analyze the provided document, identify which type of document it is and extract its details.
+
+Procedure:
+- The goal is to classify the text as exactly one of the document types below, or as 'other_document'.
+- Document types:
+""" + type_list + """
+- Set document.document_type to the matching type and fill in the fields of that type from the text.
+- If the document is none of these types, return the document type as 'other_document' with no other fields.
+
+The data to analyze:
+""" + formatted_text
+
+    return dict(
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        model="llama3.3:70b",
+        format=DocumentClassification,
+        options={'temperature': 0.1},
+    )
+
+
+def classify_document(formatted_text: str, client: Optional[LLMClient] = None) -> Optional[dict]:
+    """
+    Identifies the document type and extracts its fields in a single LLM call.
+
+    Replaces asking each validator in turn whether the text is its type.
+
+    Args:
+        formatted_text (str): The OCR (or reframed) text of the document.
+        client (LLMClient): Shared Ollama client; defaults to get_llm_client().
+
+    Returns:
+        dict: "document_type" (a key of DOCUMENT_TYPES or "other_document") and the
+        fields of that type, or None if an error occurs.
+    """
+    try:
+        # Send the chat request
+        response = (client or get_llm_client()).chat(**_chat_request(formatted_text))
+
+        # Parse and validate the response
+        output_json = DocumentClassification.model_validate_json(response.message.content)
+        print("Validation successful:", output_json)
+        return output_json.document.dict()
+
+    except ValidationError as ve:
+        print("Validation error:", ve)
+    except Exception as e:
+        print("An error occurred during processing:", e)
+
+    return None
+
+
+async def classify_document_async(formatted_text: str, client: Optional[AsyncLLMClient] = None) -> Optional[dict]:
+    """Async counterpart of classify_document, using an AsyncLLMClient (get_async_llm_client() by default)."""
+    try:
+        response = await (client or get_async_llm_client()).chat(**_chat_request(formatted_text))
+
+        # Parse and validate the response
+        output_json = DocumentClassification.model_validate_json(response.message.content)
+        print("Validation successful:", output_json)
+        return output_json.document.dict()
+
+    except ValidationError as ve:
+        print("Validation error:", ve)
+    except Exception as e:
+        print("An error occurred during processing:", e)
+
+    return None
+
+
+# Example usage
+if __name__ == "__main__":
+    sample_text = """
+    BILL OF SUPPLY COMMERCIAL BILL DATE 30-Dec-2024 SHREE LAXMI DEVELOPERS G-19 ZOOM PLAZA, L T ROAD, BORIVALI WEST, MUMBAI 400092
+    Bill Month Dec-24 Units Consumed 45 Current Month Bill ₹1107.35 Due Date: 20-Jan-2025 Adani Electricity www.adanielectricity.com
+    """
+    result = classify_document(sample_text)
+    if result:
+        print("Document type:", result["document_type"], "->", result)
+    else:
+        print("Failed to classify the document.")
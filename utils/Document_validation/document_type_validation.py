@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ValidationError
 from typing import Literal, Optional
-from ollama import chat
+from utils.llm_client import AsyncLLMClient, LLMClient, get_async_llm_client, get_llm_client
 
 
 # Define the data model
@@ -17,39 +17,63 @@ class ValidDocumentType(BaseModel):
     ]]
 
 
-def extract_event_information(text: str) -> Optional[dict]:
+def _chat_request(text: str) -> dict:
+    """Chat arguments (prompt, model, schema and options) for one document."""
+    # Prepare the prompt
+    prompt = """
+Aim: To analyze the provided document and predict if the text is from an achievement certificate or not.
+
+Procedure:
+- The goal is to classify whether the text is an achievement_certificate or another type of document.
+- If the text is an achievement certificate, extract the following details:
+  - Student Name
+- If the document is not an achievement certificate, return the document type as 'other_document' and leave other fields empty.
+
+The data to analyze: 
+""" + formatted_text
+
+    return dict(
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        model="llama3.3:70b",
+        format=ValidDocumentType,
+        options={'temperature': 0.2},
+    )
+
+
+def extract_event_information(text: str, client: Optional[LLMClient] = None) -> Optional[dict]:
     """
     Extracts event information from the input text using OpenAI's API.
 
     Args:
         text (str): The input text containing document information.
+        client (LLMClient): Shared Ollama client; defaults to get_llm_client().
 
     Returns:
         dict: Parsed document type and additional information or None if an error occurs.
     """
     try:
-        # Prepare the prompt
-        prompt = """
-Aim: To analyze the provided document and predict if the text is from an achievement certificate or not.
+        # Send the chat request
+        response = (client or get_llm_client()).chat(**_chat_request(text))
 
-Procedure:
-- The goal is to classify whether the text is an achievement_certificate or another type of document.
-- If the text is an achievement certificate, extract the following details:
-  - Student Name
-- If the document is not an achievement certificate, return the document type as 'other_document' and leave other fields empty.
+        # Parse and validate the response
+        output_json = ValidDocumentType.model_validate_json(response.message.content)
+        print("Validation successful:", output_json)
+        return output_json.dict()
 
-The data to analyze: 
-""" + formatted_text
+    except ValidationError as ve:
+        print("Validation error:", ve)
+    except Exception as e:
+        print("An error occurred during processing:", e)
 
-        # Send the chat request
-        response = chat(
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            model="llama3.3:70b",
-            format=ValidDocumentType.model_json_schema(),
-            options={'temperature': 0.2},
-        )
+    return None
+
+
+async def extract_event_information_async(text: str, client: Optional[AsyncLLMClient] = None) -> Optional[dict]:
+    """Async counterpart of extract_event_information, using an AsyncLLMClient (get_async_llm_client() by default)."""
+    try:
+        response = await (client or get_async_llm_client()).chat(**_chat_request(text))
 
         # Parse and validate the response
         output_json = ValidDocumentType.model_validate_json(response.message.content)
@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Optional
+import cv2
+from utils.ocr_tools.document_loader import find_documents
+from utils.Document_validation.blurness_detection import (
+    is_page_blurry,
+    load_quality_profile,
+    process_document,
+    set_quality_profile,
+)
+
+# Files handed to each worker process ahead of time; bounds how many futures
+# are pending when a tree holds many thousands of files.
+SUBMIT_AHEAD_PER_WORKER = 4
+
+
+def _init_worker(profile_path: Optional[str]):
+    # One page at a time per process: the pool already uses every core
+    cv2.setNumThreads(1)
+    if profile_path:
+        set_quality_profile(load_quality_profile(profile_path))
+
+
+def triage_file(file_path: str, text_regions: bool = False) -> dict:
+    """
+    Score every page of one file and decide whether it may go to OCR.
+
+    Args:
+        file_path: Path to a PDF or image.
+        text_regions: Decide on the text tiles of the blur map.
+
+    Returns:
+        A report record: "path", "decision" ("accept", "reject" or "error"),
+        "classification", "blurry_pages", "page_count", per-page metrics,
+        the profile used and the wall-clock "seconds". A file with a page
+        that could not be read is an "error" with an "error" message, not a
+        reject.
+    """
+    start = time.perf_counter()
+    record = {"path": file_path}
+    try:
+        report = process_document(file_path, max_workers=1, with_blur_map=text_regions)
+        # A page that could not be read says nothing about blur; the file is
+        # an error, which a resumed run retries
+        error_pages = [page for page in report["pages"] if page["classification"] == "Error"]
+        blurry_pages = [page["page"] for page in report["pages"]
+                        if page["classification"] != "Error" and is_page_blurry(page, text_regions)]
+        pages = []
+        for page in report["pages"]:
+            blur_map = page.pop("blur_map", None)
+            if blur_map is not None:
+                # The full tile grid is too bulky for a line-per-file report
+                page["blurry_text_fraction"] = blur_map["blurry_text_fraction"]
+                page["largest_blurry_text_run"] = blur_map["largest_blurry_text_run"]
+            pages.append(page)
+        if error_pages:
+            record.update(
+                decision="error",
+                error="; ".join(f"page {page['page']}: {page['error']}" for page in error_pages),
+                classification="Error",
+            )
+        else:
+            record.update(
+                decision="reject" if blurry_pages else "accept",
+                classification="Blurry" if blurry_pages else "Not Blurry",
+            )
+        record.update(
+            blurry_pages=blurry_pages,
+            page_count=report["page_count"],
+            profile=next((page["profile"] for page in pages if "profile" in page), None),
+            pages=pages,
+        )
+    except Exception as e:
+        record.update(decision="error", error=str(e))
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def load_done_paths(report_path: str) -> set:
+    """
+    Return the files a (possibly interrupted) report already decided.
+
+    Only "accept" and "reject" records count: files that ended in "error"
+    are triaged again, and their new record follows the old one. A line cut
+    short by the interruption is ignored, so that file is triaged again.
+    """
+    done = set()
+    if not os.path.exists(report_path):
+        return done
+    with open(report_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if record["decision"] in ("accept", "reject"):
+                    done.add(record["path"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done
+
+
+def triage_directory(directory: str, report_path: str, workers: Optional[int] = None, resume: bool = True,
+                     text_regions: bool = False, profile_path: Optional[str] = None) -> dict:
+    """
+    Triage every PDF and image under a directory into a JSONL report.
+
+    Files are scored on a process pool and each record is appended and
+    flushed as soon as its file finishes, so the report is usable while the
+    run is in progress and survives an interruption. With ``resume`` the
+    files the report already accepted or rejected are skipped; errors are
+    retried.
+
+    Args:
+        directory: Root of the tree to walk.
+        report_path: JSONL report to write (appended to when resuming).
+        workers: Worker processes. Defaults to the number of CPUs.
+        resume: Skip files already present in the report.
+        text_regions: Decide on the text tiles of the blur map.
+        profile_path: Quality profile for the workers (see calibrate_quality.py).
+
+    Returns:
+        Counts of "accept", "reject", "error" and "skipped" files.
+    """
+    files = find_documents(directory)
+    done = load_done_paths(report_path) if resume else set()
+    pending = [path for path in files if path not in done]
+    counts = {"accept": 0, "reject": 0, "error": 0, "skipped": len(files) - len(pending)}
+    print(f"Triaging {len(pending)} files under {directory} ({counts['skipped']} already in {report_path})")
+    if not pending:
+        return counts
+
+    workers = workers or os.cpu_count() or 1
+    mode = "a" if resume else "w"
+    with open(report_path, mode, encoding="utf-8") as report, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(profile_path,)) as executor:
+        if mode == "a" and os.path.getsize(report_path) > 0:
+            # Terminate a line left unfinished by an interrupted run
+            with open(report_path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n":
+                    report.write("\n")
+
+        remaining = iter(pending)
+        running = set()
+        while True:
+            for path in remaining:
+                running.add(executor.submit(triage_file, path, text_regions))
+                if len(running) >= workers * SUBMIT_AHEAD_PER_WORKER:
+                    break
+            if not running:
+                break
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                report.write(json.dumps(record) + "\n")
+                report.flush()
+                counts[record["decision"]] += 1
+                print(f"{record['decision']:>6}  {record['seconds']:7.2f}s  {record['path']}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reject unreadable scans before they reach OCR.")
+    parser.add_argument("directory", help="Directory tree to triage, e.g. images/12th")
+    parser.add_argument("--report", default="quality_report.jsonl", help="JSONL report path")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument("--restart", action="store_true", help="Overwrite the report instead of resuming")
+    parser.add_argument("--text-regions", action="store_true", help="Decide on the text regions of each page")
+    parser.add_argument("--profile", default=None, help="Quality profile JSON (see calibrate_quality.py)")
+    args = parser.parse_args()
+
+    counts = triage_directory(args.directory, args.report, args.workers, not args.restart,
+                              args.text_regions, args.profile)
+    print("Triage summary:", counts)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ValidationError
 from typing import Literal, Optional
-from ollama import chat
+from utils.llm_client import AsyncLLMClient, LLMClient, get_async_llm_client, get_llm_client
 
 
 # Define the data model
@@ -11,17 +11,10 @@ class electricity_bill(BaseModel):
     name_of_the_owner: str
 
 
-def extract_event_information(surya_ocr_text: str, easy_ocr_text: str) -> Optional[dict]:
-    """
-    Extracts event information from the input text using OpenAI's API.
-    Args:
-        text (str): The input text containing document information.
-    Returns:
-        dict: Parsed document type and additional information or None if an error occurs.
-    """
-    try:
-        # Prepare the prompt
-        prompt = """
+def _chat_request(surya_ocr_text: str, easy_ocr_text: str) -> dict:
+    """Chat arguments (prompt, model, schema and options) for one document."""
+    # Prepare the prompt
+    prompt = """
 Aim: To analyze and extract relevant information from an OCR-extracted text of a document.
 
 Procedure:
@@ -34,16 +27,47 @@ Surya OCR Extracted Data: """ + surya_ocr_text + "\nEasyOCR Extracted Data: " +
 
  #+ f"The data for same image is extracted from two OCRs. Refer both the text for better understanding: 1) Surya OCR Extrcated Data: {surya_ocr_text}\n\n2) EasyOCR Extrcated Data: {easy_ocr_text}"
 
+    return dict(
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        model="llama3.3:70b",
+        #format=electricity_bill.model_json_schema(),
+        options={'temperature': 0.2},
+    )
+
 
+def extract_event_information(surya_ocr_text: str, easy_ocr_text: str, client: Optional[LLMClient] = None) -> Optional[dict]:
+    """
+    Extracts event information from the input text using OpenAI's API.
+    Args:
+        text (str): The input text containing document information.
+        client (LLMClient): Shared Ollama client; defaults to get_llm_client().
+    Returns:
+        dict: Parsed document type and additional information or None if an error occurs.
+    """
+    try:
         # Send the chat request
-        response = chat(
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            model="llama3.3:70b",
-            #format=electricity_bill.model_json_schema(),
-            options={'temperature': 0.2},
-        )
+        response = (client or get_llm_client()).chat(**_chat_request(surya_ocr_text, easy_ocr_text))
+
+        # Parse and validate the response
+        # output_json = electricity_bill.model_validate_json(response.message.content)
+        output_json = response.message.content
+        print("Validation successful:", output_json)
+        return output_json.dict()
+
+    except ValidationError as ve:
+        print("Validation error:", ve)
+    except Exception as e:
+        print("An error occurred during processing:", e)
+
+    return None
+
+
+async def extract_event_information_async(surya_ocr_text: str, easy_ocr_text: str, client: Optional[AsyncLLMClient] = None) -> Optional[dict]:
+    """Async counterpart of extract_event_information, using an AsyncLLMClient (get_async_llm_client() by default)."""
+    try:
+        response = await (client or get_async_llm_client()).chat(**_chat_request(surya_ocr_text, easy_ocr_text))
 
         # Parse and validate the response
         # output_json = electricity_bill.model_validate_json(response.message.content)
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+from utils.kv_cache import SqliteLRUCache
+
+LLM_CACHE_PATH = os.environ.get(
+    "LLM_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "document_ocr", "llm_cache.sqlite3")
+)
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+# Responses older than this are asked again (unset or 0 keeps them until evicted by size)
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))) or None
+# Set LLM_CACHE_ENABLED=0 to send every request to the server
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+
+# Bumped whenever the key, the stored response layout or the rule for what
+# gets stored changes (2: structured answers only once they validate)
+LLM_CACHE_FORMAT_VERSION = 2
+
+_cache_lock = threading.Lock()
+_cache = None
+
+
+def get_llm_cache() -> SqliteLRUCache:
+    """Return the process-wide LLM response cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SqliteLRUCache(LLM_CACHE_PATH, LLM_CACHE_MAX_BYTES, ttl_seconds=LLM_CACHE_TTL_SECONDS)
+    return _cache
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def make_llm_cache_key(model: str, messages: list, format=None, options: Optional[dict] = None) -> str:
+    """Key a chat request by model, options, prompt (all messages) and JSON schema."""
+    return ":".join((
+        f"v{LLM_CACHE_FORMAT_VERSION}",
+        model,
+        _digest(options or {})[:16],
+        _digest(messages),
+        _digest(format)[:16],
+    ))
+
+
+def get_cached_response(key: str) -> Optional[bytes]:
+    """Return the stored response for ``key``, or None."""
+    try:
+        return get_llm_cache().get(key)
+    except Exception as e:
+        print("LLM cache read failed:", e)
+        return None
+
+
+def put_cached_response(key: str, value: bytes):
+    """Store a serialized response under ``key``."""
+    try:
+        get_llm_cache().put(key, value)
+    except Exception as e:
+        print("LLM cache write failed:", e)
+
+
+def get_llm_cache_stats() -> dict:
+    """Return hit/miss counters and size of the LLM response cache."""
+    return get_llm_cache().stats()
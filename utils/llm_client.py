@@ -0,0 +1,274 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Union
+import httpx
+from ollama import AsyncClient, ChatResponse, Client
+from pydantic import BaseModel
+from utils.llm_cache import LLM_CACHE_ENABLED, get_cached_response, make_llm_cache_key, put_cached_response
+
+# Ollama servers to use, comma separated; the first reachable one serves a
+# model until it fails, then the next one takes over.
+OLLAMA_HOSTS = [
+    host.strip()
+    for host in os.environ.get("OLLAMA_HOSTS", os.environ.get("OLLAMA_HOST", "http://127.0.0.1:11434")).split(",")
+    if host.strip()
+]
+# How long the server keeps a model loaded after a request. The default of a
+# few minutes lets the 70B model be evicted between documents.
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+# Seconds to wait for a response, and to establish a connection
+OLLAMA_TIMEOUT = float(os.environ.get("OLLAMA_TIMEOUT", "300"))
+OLLAMA_CONNECT_TIMEOUT = float(os.environ.get("OLLAMA_CONNECT_TIMEOUT", "5"))
+# HTTP connections kept open per host
+OLLAMA_MAX_CONNECTIONS = int(os.environ.get("OLLAMA_MAX_CONNECTIONS", "16"))
+# Requests to one model in flight at once from an AsyncLLMClient; match the
+# server's OLLAMA_NUM_PARALLEL so extra requests wait here, not on the server.
+OLLAMA_MAX_CONCURRENCY_PER_MODEL = int(os.environ.get("OLLAMA_MAX_CONCURRENCY_PER_MODEL", "4"))
+
+_client_lock = threading.Lock()
+_client = None
+_async_client = None
+
+
+def response_validates(response, format) -> Optional[bool]:
+    """
+    Whether a chat answer validates against ``format``, its pydantic model.
+
+    Returns None when ``format`` is not a pydantic model (no format, or a
+    bare JSON schema), as there is nothing to validate against.
+    """
+    if not (isinstance(format, type) and issubclass(format, BaseModel)):
+        return None
+    try:
+        format.model_validate_json(response.message.content)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+class _HostSelection:
+    """Host list and per-model host affinity shared by the sync and async clients."""
+
+    def __init__(self, hosts: Optional[Iterable[str]], keep_alive: Union[str, float], timeout: float,
+                 connect_timeout: float, max_connections: int, use_cache: bool):
+        self.hosts = list(hosts or OLLAMA_HOSTS)
+        if not self.hosts:
+            raise ValueError("At least one Ollama host is required")
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.use_cache = use_cache
+        self._client_options = {
+            "timeout": httpx.Timeout(timeout, connect=connect_timeout),
+            "limits": httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        }
+        self._preferred = {}
+        self._lock = threading.Lock()
+
+    def _host_order(self, model: str) -> List[int]:
+        with self._lock:
+            first = self._preferred.get(model, 0)
+        return [(first + offset) % len(self.hosts) for offset in range(len(self.hosts))]
+
+    def _host_failed(self, index: int, model: str, error: Exception):
+        print(f"Ollama host {self.hosts[index]} failed for {model}: {error}")
+
+    def _host_served(self, index: int, model: str):
+        with self._lock:
+            self._preferred[model] = index
+
+    def _cache_key(self, use_cache: Optional[bool], model: str, messages: list, format, options) -> Optional[str]:
+        if not (self.use_cache if use_cache is None else use_cache):
+            return None
+        return make_llm_cache_key(model, messages, format, options)
+
+    @staticmethod
+    def _schema(format):
+        # A pydantic model is sent (and keyed) as its JSON schema
+        if isinstance(format, type) and issubclass(format, BaseModel):
+            return format.model_json_schema()
+        return format
+
+    @staticmethod
+    def _cacheable(response, format) -> bool:
+        # Only answers the caller can use are stored: a structured answer must
+        # validate against its pydantic model. A bare JSON schema gives nothing
+        # to validate against, so those answers are asked again
+        return format is None or bool(response_validates(response, format))
+
+
+class LLMClient(_HostSelection):
+    """One configured Ollama client for every LLM call in the pipeline.
+
+    Each host gets a single ollama.Client whose HTTP connection pool is
+    reused across calls and threads. Every request carries ``keep_alive`` so
+    the model stays loaded between documents, and is bounded by ``timeout``.
+    A model sticks to the host that last served it; on a connection error or
+    timeout the call is retried on the next host.
+    """
+
+    def __init__(self, hosts: Optional[Iterable[str]] = None, keep_alive: Union[str, float] = OLLAMA_KEEP_ALIVE,
+                 timeout: float = OLLAMA_TIMEOUT, connect_timeout: float = OLLAMA_CONNECT_TIMEOUT,
+                 max_connections: int = OLLAMA_MAX_CONNECTIONS, use_cache: bool = LLM_CACHE_ENABLED):
+        super().__init__(hosts, keep_alive, timeout, connect_timeout, max_connections, use_cache)
+        self._clients = [Client(host=host, **self._client_options) for host in self.hosts]
+
+    def _call(self, model: str, request):
+        last_error = None
+        for index in self._host_order(model):
+            try:
+                response = request(self._clients[index])
+            except (httpx.TransportError, ConnectionError) as e:
+                self._host_failed(index, model, e)
+                last_error = e
+                continue
+            self._host_served(index, model)
+            return response
+        raise last_error
+
+    def chat(self, model: str, messages: list, format=None, options: Optional[dict] = None,
+             use_cache: Optional[bool] = None):
+        """Send a chat request; same arguments and response as ollama.chat.
+
+        ``format`` may also be a pydantic model, sent as its JSON schema. An
+        identical earlier request (same model, options, messages and schema)
+        is answered from the LLM response cache unless caching is off for this
+        client or ``use_cache`` is False. Structured answers are only cached
+        once they validate against the ``format`` model.
+        """
+        schema = self._schema(format)
+        key = self._cache_key(use_cache, model, messages, schema, options)
+        if key is not None:
+            cached = get_cached_response(key)
+            if cached is not None:
+                return ChatResponse.model_validate_json(cached)
+        response = self._call(model, lambda client: client.chat(
+            model=model, messages=messages, format=schema, options=options, keep_alive=self.keep_alive,
+        ))
+        if key is not None and self._cacheable(response, format):
+            put_cached_response(key, response.model_dump_json().encode("utf-8"))
+        return response
+
+    def warm_up(self, models: Iterable[str]):
+        """Load ``models`` on their host now so the first document does not wait for them."""
+        for model in models:
+            print(f"Loading {model} on Ollama...")
+            start = time.perf_counter()
+            try:
+                self._call(model, lambda client: client.generate(model=model, prompt="", keep_alive=self.keep_alive))
+                print(f"Loaded {model} in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                print(f"Could not load {model}: {e}")
+
+
+class AsyncLLMClient(_HostSelection):
+    """Asyncio counterpart of LLMClient, built on ollama.AsyncClient.
+
+    Calls to one model are bounded by a semaphore (``max_concurrency`` per
+    model, overridable in ``model_concurrency``), so a single event loop can
+    keep the server busy without queueing unbounded requests on it. Use one
+    instance per event loop.
+    """
+
+    def __init__(self, hosts: Optional[Iterable[str]] = None, keep_alive: Union[str, float] = OLLAMA_KEEP_ALIVE,
+                 timeout: float = OLLAMA_TIMEOUT, connect_timeout: float = OLLAMA_CONNECT_TIMEOUT,
+                 max_connections: int = OLLAMA_MAX_CONNECTIONS,
+                 max_concurrency: int = OLLAMA_MAX_CONCURRENCY_PER_MODEL,
+                 model_concurrency: Optional[Dict[str, int]] = None, use_cache: bool = LLM_CACHE_ENABLED):
+        super().__init__(hosts, keep_alive, timeout, connect_timeout, max_connections, use_cache)
+        self._clients = [AsyncClient(host=host, **self._client_options) for host in self.hosts]
+        self.max_concurrency = max(1, max_concurrency)
+        self.model_concurrency = dict(model_concurrency or {})
+        self._semaphores = {}
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.model_concurrency.get(model, self.max_concurrency))
+            self._semaphores[model] = semaphore
+        return semaphore
+
+    async def _call(self, model: str, request):
+        async with self._semaphore(model):
+            last_error = None
+            for index in self._host_order(model):
+                try:
+                    response = await request(self._clients[index])
+                except (httpx.TransportError, ConnectionError) as e:
+                    self._host_failed(index, model, e)
+                    last_error = e
+                    continue
+                self._host_served(index, model)
+                return response
+            raise last_error
+
+    async def chat(self, model: str, messages: list, format=None, options: Optional[dict] = None,
+                   use_cache: Optional[bool] = None):
+        """Send a chat request; same arguments and response as ollama.AsyncClient.chat.
+
+        Takes a pydantic model as ``format`` and uses the LLM response cache
+        like LLMClient.chat; cache lookups run on a worker thread so the event
+        loop never waits on disk.
+        """
+        schema = self._schema(format)
+        key = self._cache_key(use_cache, model, messages, schema, options)
+        if key is not None:
+            cached = await asyncio.to_thread(get_cached_response, key)
+            if cached is not None:
+                return ChatResponse.model_validate_json(cached)
+        response = await self._call(model, lambda client: client.chat(
+            model=model, messages=messages, format=schema, options=options, keep_alive=self.keep_alive,
+        ))
+        if key is not None and self._cacheable(response, format):
+            await asyncio.to_thread(put_cached_response, key, response.model_dump_json().encode("utf-8"))
+        return response
+
+    async def warm_up(self, models: Iterable[str]):
+        """Load ``models`` on their host now so the first document does not wait for them."""
+        for model in models:
+            print(f"Loading {model} on Ollama...")
+            start = time.perf_counter()
+            try:
+                await self._call(model, lambda client: client.generate(model=model, prompt="", keep_alive=self.keep_alive))
+                print(f"Loaded {model} in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                print(f"Could not load {model}: {e}")
+
+
+def get_llm_client() -> LLMClient:
+    """Return the process-wide LLM client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
+    return _client
+
+
+def set_llm_client(client: Optional[LLMClient]):
+    """Use ``client`` for every caller that is not given one; None restores the default."""
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def get_async_llm_client() -> AsyncLLMClient:
+    """Return the process-wide async LLM client, creating it on first use.
+
+    The client belongs to the event loop that first uses it; a service with
+    several loops should create one AsyncLLMClient per loop instead.
+    """
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncLLMClient()
+    return _async_client
+
+
+def set_async_llm_client(client: Optional[AsyncLLMClient]):
+    """Use ``client`` for every async caller that is not given one; None restores the default."""
+    global _async_client
+    with _client_lock:
+        _async_client = client
@@ -0,0 +1,219 @@
+import hashlib
+import os
+import threading
+import weakref
+from typing import Iterable, Iterator, Optional, Union
+import numpy as np
+from PIL import Image
+from pdf2image import convert_from_path, pdfinfo_from_path
+from utils.ocr_tools.text_layer import extract_text_layers, get_text_layer_page
+
+# Resolution every stage works at. Blur thresholds were tuned on 300 DPI pages.
+DEFAULT_DPI = 300
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.tiff', '.bmp')
+
+
+def compute_file_hash(file_path: str) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def grayscale_array(image: Image.Image, max_side: Optional[int] = None) -> np.ndarray:
+    """Return a page as an 8-bit grayscale array no larger than ``max_side`` on its long side.
+
+    The page is box-reduced inside PIL by the smallest whole factor that fits
+    ``max_side`` (a 300 DPI A4 page and max_side 1500 give 100 DPI) before the
+    grayscale conversion, so no full-size array is ever made.
+    """
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("RGB")
+    if max_side:
+        factor = -(-max(image.size) // max_side)
+        if factor > 1:
+            image = image.reduce(factor)
+    return np.asarray(image.convert("L"))
+
+
+def find_documents(directory: str) -> list:
+    """Return the absolute paths of the PDFs and images under ``directory``, sorted."""
+    files = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.lower().endswith(('.pdf',) + IMAGE_EXTENSIONS):
+                files.append(os.path.abspath(os.path.join(root, name)))
+    return sorted(files)
+
+
+class Document:
+    """An input file that is decoded once and shared by every pipeline stage.
+
+    PDF pages are rasterized one at a time, on demand, using poppler's
+    first/last page range. Pages fetched with ``page()`` are kept so blur
+    detection, both OCR engines and enhancement read the same PIL image;
+    ``iter_pages()`` streams the rest without holding the whole document in
+    memory. A streamed page is still shared with any other thread that asks
+    for it while it is alive, so concurrent stages do not render it twice.
+    ``content_hash`` identifies the file by content rather than path.
+    """
+
+    def __init__(self, path: str, dpi: int = DEFAULT_DPI):
+        lower_path = path.lower()
+        if not lower_path.endswith('.pdf') and not lower_path.endswith(IMAGE_EXTENSIONS):
+            raise ValueError("Unsupported file type. Please provide a PDF or an image file.")
+        self.path = path
+        self.dpi = dpi
+        self.is_pdf = lower_path.endswith('.pdf')
+        self.content_hash = compute_file_hash(path)
+        self._page_count = None
+        self._pages = {}
+        self._live_pages = weakref.WeakValueDictionary()
+        self._page_locks = {}
+        self._page_variants = {}
+        self._text_layers = None
+        self._lock = threading.Lock()
+        # Held while reading the page count or the text layer, so concurrent
+        # first callers wait for one pdfinfo/pdftotext run instead of each
+        # starting their own
+        self._metadata_lock = threading.Lock()
+
+    def __repr__(self):
+        return f"Document({self.path!r}, dpi={self.dpi}, hash={self.content_hash[:12]})"
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages, read from the PDF metadata without rasterizing."""
+        if self._page_count is None:
+            with self._metadata_lock:
+                if self._page_count is None:
+                    if self.is_pdf:
+                        self._page_count = int(pdfinfo_from_path(self.path)["Pages"])
+                    else:
+                        self._page_count = 1
+        return self._page_count
+
+    def _render_page(self, index: int) -> Image.Image:
+        if index < 0 or index >= self.page_count:
+            raise IndexError(f"Page {index + 1} out of range (document has {self.page_count} pages)")
+        if self.is_pdf:
+            print(f"Converting page {index + 1} of PDF {self.path} to image...")
+            pages = convert_from_path(self.path, dpi=self.dpi, first_page=index + 1, last_page=index + 1)
+            if not pages:
+                raise ValueError("Could not extract any pages from the PDF.")
+            return pages[0]
+        image = Image.open(self.path)
+        image.load()
+        return image
+
+    def _get_page(self, index: int, keep: bool) -> Image.Image:
+        with self._lock:
+            page_lock = self._page_locks.setdefault(index, threading.Lock())
+        # One render per page at a time; other pages can render in parallel
+        with page_lock:
+            with self._lock:
+                image = self._pages.get(index)
+                if image is None:
+                    image = self._live_pages.get(index)
+            if image is None:
+                image = self._render_page(index)
+            with self._lock:
+                if keep:
+                    self._pages[index] = image
+                else:
+                    self._live_pages[index] = image
+        return image
+
+    def page(self, index: int = 0) -> Image.Image:
+        """Return one page (0-based) as a PIL Image, kept for later stages."""
+        return self._get_page(index, keep=True)
+
+    def iter_pages(self, first: int = 0, last: Optional[int] = None, keep: bool = False,
+                   indices: Optional[Iterable[int]] = None) -> Iterator[Image.Image]:
+        """Yield pages ``first``..``last`` (0-based, inclusive) one at a time.
+
+        Pages another stage already fetched are reused. Other pages are
+        rasterized on demand and dropped once every user moves on, unless
+        ``keep`` is set. ``indices`` selects an explicit list of pages instead
+        of a range.
+        """
+        if indices is None:
+            last = self.page_count - 1 if last is None else min(last, self.page_count - 1)
+            indices = range(first, last + 1)
+        for index in indices:
+            yield self._get_page(index, keep)
+
+    @property
+    def pages(self) -> list:
+        """All pages as PIL Images. Prefer ``iter_pages()`` for long documents."""
+        return list(self.iter_pages(keep=True))
+
+    def replace_page(self, index: int, image: Union[Image.Image, np.ndarray], variant: str):
+        """Substitute a processed version of a page for every later stage.
+
+        ``image`` is a PIL Image or an RGB array. ``variant`` names the
+        processing (e.g. "enhanced-v1") and becomes part of the page's OCR
+        cache key, so results of the original and processed page never mix.
+        """
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        with self._lock:
+            self._pages[index] = image
+            self._live_pages.pop(index, None)
+            self._page_variants[index] = variant
+
+    def release_pages(self, indices: Iterable[int]):
+        """Stop keeping pages fetched with ``keep`` or substituted by replace_page.
+
+        A released page is rasterized again (without its processing) if a
+        later stage asks for it.
+        """
+        with self._lock:
+            for index in indices:
+                self._pages.pop(index, None)
+                self._page_variants.pop(index, None)
+
+    def page_variant(self, index: int) -> str:
+        """Name of the processing applied to a page by replace_page, or ""."""
+        return self._page_variants.get(index, "")
+
+    def page_array(self, index: int = 0) -> np.ndarray:
+        """Return one page as an RGB NumPy array."""
+        return np.array(self.page(index).convert("RGB"))
+
+    def text_layer(self, index: int = 0) -> Optional[dict]:
+        """Return the embedded text of a born-digital PDF page, or None.
+
+        None means the page has no usable text layer (scanned page or image
+        file) and has to go through OCR. Boxes are in pixels at ``dpi``.
+        """
+        if not self.is_pdf:
+            return None
+        if self._text_layers is None:
+            with self._metadata_lock:
+                if self._text_layers is None:
+                    try:
+                        self._text_layers = extract_text_layers(self.path, dpi=self.dpi)
+                    except Exception as e:
+                        print(f"Could not read the text layer of {self.path}: {e}")
+                        self._text_layers = []
+        return get_text_layer_page(self._text_layers, index)
+
+
+def load_document(file_path: str, dpi: int = DEFAULT_DPI) -> Document:
+    """Open an image or PDF as a shared Document.
+
+    :param file_path: Path to the image or PDF file.
+    :param dpi: Resolution used when rasterizing PDF pages.
+    :return: Document whose pages are decoded once on first use.
+    """
+    return Document(file_path, dpi=dpi)
+
+
+def as_document(source: Union[str, Document], dpi: int = DEFAULT_DPI) -> Document:
+    """Return ``source`` unchanged if it is already a Document, else load it."""
+    if isinstance(source, Document):
+        return source
+    return load_document(source, dpi=dpi)
@@ -1,59 +1,112 @@
-from PIL import Image
-from pdf2image import convert_from_path
-import easyocr
 import os
+import time
 import numpy as np
+from typing import Optional
+from utils.ocr_tools.model_registry import easyocr_reader, record_inference_time
+from utils.ocr_tools.document_loader import as_document
+from utils.ocr_tools.ocr_cache import get_cached_page, put_cached_page
+from utils.ocr_tools.ocr_result import OcrDocument, OcrLine, OcrPage
 
 def load_file(input_path):
-    """Load a file and convert it to a list of PIL Images."""
+    """Load a file (path or shared Document) as a list of PIL Images."""
     try:
-        if input_path.lower().endswith('.pdf'):
-            print(f"Converting PDF {input_path} to images...")
-            images = convert_from_path(input_path)
-            print("Converted PDF to images")
-            return images  # Return a list of PIL Image objects
-        elif input_path.lower().endswith(('.png', '.jpg', '.jpeg', '.tiff', '.bmp')):
-            print(f"Loading image {input_path}...")
-            image = Image.open(input_path)
-            return [image]  # Return a list with a single PIL Image object
-        else:
-            raise ValueError("Unsupported file type. Please provide a PDF or an image file.")
+        # Reuses the pages if the document was already rasterized by another stage
+        return as_document(input_path).pages
     except FileNotFoundError:
         raise FileNotFoundError(f"Error: File not found at {input_path}")
     except Exception as e:
         raise Exception(f"Error: Could not load the file. {str(e)}")
 
-def extract_text_from_images(images):
-    """Extract text using EasyOCR from a list of PIL Images."""
-    try:
-        reader = easyocr.Reader(['en'])  # Initialize EasyOCR with English language
-        extracted_text = []
+def _results_to_page(page_number: int, results) -> OcrPage:
+    lines = []
+    for points, text, confidence in results:
+        xs = [float(point[0]) for point in points]
+        ys = [float(point[1]) for point in points]
+        lines.append(OcrLine(text, (min(xs), min(ys), max(xs), max(ys)), float(confidence), "easyocr"))
+    return OcrPage(page_number, lines, "easyocr", "\n")
+
+def extract_pages(images, languages=('en',), page_numbers=None) -> list:
+    """Run EasyOCR on a list (or iterator) of PIL Images and return one OcrPage per image."""
+    pages = []
 
+    # Borrow a pooled reader instead of reloading the weights every call
+    with easyocr_reader(languages) as reader:
         for i, image in enumerate(images):
-            print(f"Processing page {i + 1}...")
+            page_number = page_numbers[i] if page_numbers else i + 1
+            print(f"Processing page {page_number}...")
             image_array = np.array(image)  # Convert PIL Image to NumPy array
+            start = time.perf_counter()
             results = reader.readtext(image_array)  # Extract text
-            page_text = '\n'.join([text[1] for text in results])
-            extracted_text.append(f"--- Page {i + 1} ---\n{page_text}")
+            record_inference_time("easyocr", time.perf_counter() - start)
+            pages.append(_results_to_page(page_number, results))
+
+    return pages
 
-        return "\n\n".join(extracted_text)
+def extract_page_texts(images, languages=('en',)) -> list:
+    """Run EasyOCR on a list (or iterator) of PIL Images and return one text per page."""
+    return [page.text for page in extract_pages(images, languages)]
+
+def extract_text_from_images(images, languages=('en',)):
+    """Extract text using EasyOCR from a list (or iterator) of PIL Images."""
+    try:
+        page_texts = extract_page_texts(images, languages)
+        return "\n\n".join(f"--- Page {i + 1} ---\n{page_text}" for i, page_text in enumerate(page_texts))
     except Exception as e:
         raise Exception(f"Error: Could not extract text from images. {str(e)}")
 
-def get_image_text_easyocr(input_path):
+def get_pages_easyocr(input_path, use_text_layer: bool = True, use_cache: bool = True,
+                      first_page: int = 1, last_page: Optional[int] = None) -> OcrDocument:
+    """Read the pages of an image or PDF, using EasyOCR only where needed.
+
+    :param input_path: Path to the image or PDF file, or a loaded Document.
+    :param use_text_layer: Use the embedded text of born-digital PDF pages and OCR only scanned pages.
+    :param use_cache: Reuse OCR results stored for the same file content, page, model version and DPI.
+    :param first_page: First page to read (1-based).
+    :param last_page: Last page to read (1-based, inclusive); defaults to the last page.
+    :return: OcrDocument with one OcrPage (lines with box, confidence and engine) per page.
+    """
+    document = as_document(input_path)
+    last_index = document.page_count - 1 if last_page is None else min(last_page, document.page_count) - 1
+    indices = range(max(first_page, 1) - 1, last_index + 1)
+
+    # Pages that already carry a text layer skip OCR entirely
+    pages = {}
+    if use_text_layer:
+        for index in indices:
+            text_layer = document.text_layer(index)
+            if text_layer is not None:
+                pages[index] = OcrPage.from_text_layer(index + 1, text_layer)
+
+    if use_cache:
+        for index in indices:
+            if index not in pages:
+                cached = get_cached_page(document, index, "easyocr")
+                if cached is not None:
+                    pages[index] = cached
+
+    scanned_pages = [index for index in indices if index not in pages]
+    if scanned_pages:
+        # Stream pages one at a time instead of holding the whole document
+        images = document.iter_pages(indices=scanned_pages)
+        page_numbers = [index + 1 for index in scanned_pages]
+        for index, page in zip(scanned_pages, extract_pages(images, page_numbers=page_numbers)):
+            pages[index] = page
+            if use_cache:
+                put_cached_page(document, index, "easyocr", page)
+
+    return OcrDocument([pages[index] for index in indices])
+
+def get_image_text_easyocr(input_path, use_text_layer: bool = True, use_cache: bool = True):
     """Extract text from the given image or PDF using EasyOCR.
     
-    :param input_path: Path to the image or PDF file.
+    :param input_path: Path to the image or PDF file, or a loaded Document.
+    :param use_text_layer: Use the embedded text of born-digital PDF pages and OCR only scanned pages.
+    :param use_cache: Reuse OCR results cached for the same file content.
     :return: Extracted text as a string or error message.
     """
     try:
-        # Load file as images
-        images = load_file(input_path)
-        
-        # Extract text from images
-        extracted_text = extract_text_from_images(images)
-        
-        return extracted_text
+        pages = get_pages_easyocr(input_path, use_text_layer=use_text_layer, use_cache=use_cache)
+        return "\n\n".join(f"--- Page {page.page_number} ---\n{page.text}" for page in pages)
     except FileNotFoundError as e:
         return str(e)
     except ValueError as e:
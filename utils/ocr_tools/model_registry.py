@@ -0,0 +1,173 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+_surya_lock = threading.Lock()
+_surya_models = None
+
+# Number of EasyOCR readers kept per language list. A reader is not safe to
+# call from two threads at once, so concurrent callers each borrow their own.
+EASYOCR_POOL_SIZE = int(os.environ.get("EASYOCR_POOL_SIZE", "1"))
+
+_easyocr_lock = threading.Lock()
+_easyocr_pools = {}
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    "surya_load_seconds": 0.0,
+    "surya_loads": 0,
+    "surya_inference_seconds": 0.0,
+    "surya_inference_calls": 0,
+    "easyocr_load_seconds": 0.0,
+    "easyocr_loads": 0,
+    "easyocr_inference_seconds": 0.0,
+    "easyocr_inference_calls": 0,
+}
+
+
+def get_surya_models():
+    """Return the shared Surya detection/recognition models, loading them on first use.
+
+    The models are loaded at most once per process; concurrent callers wait for
+    the first load to finish instead of loading their own copy.
+
+    :return: Tuple of (det_model, det_processor, rec_model, rec_processor).
+    """
+    global _surya_models
+    if _surya_models is not None:
+        return _surya_models
+
+    with _surya_lock:
+        if _surya_models is None:
+            from surya.model.detection.model import load_model as load_det_model, load_processor as load_det_processor
+            from surya.model.recognition.model import load_model as load_rec_model
+            from surya.model.recognition.processor import load_processor as load_rec_processor
+
+            print("Loading Surya OCR models...")
+            start = time.perf_counter()
+            det_processor, det_model = load_det_processor(), load_det_model()
+            rec_model, rec_processor = load_rec_model(), load_rec_processor()
+            elapsed = time.perf_counter() - start
+            print(f"Loaded Surya OCR models in {elapsed:.2f}s")
+
+            with _metrics_lock:
+                _metrics["surya_load_seconds"] += elapsed
+                _metrics["surya_loads"] += 1
+            _surya_models = (det_model, det_processor, rec_model, rec_processor)
+
+    return _surya_models
+
+
+class _ReaderPool:
+    """Readers for one language list, created lazily up to ``size``."""
+
+    def __init__(self, languages: tuple, size: int):
+        self.languages = languages
+        self.size = max(1, size)
+        self.created = 0
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+
+    def _new_reader(self):
+        import easyocr
+
+        print(f"Loading EasyOCR reader for {list(self.languages)}...")
+        start = time.perf_counter()
+        reader = easyocr.Reader(list(self.languages))
+        elapsed = time.perf_counter() - start
+        print(f"Loaded EasyOCR reader in {elapsed:.2f}s")
+        with _metrics_lock:
+            _metrics["easyocr_load_seconds"] += elapsed
+            _metrics["easyocr_loads"] += 1
+        return reader
+
+    def acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            create = self.created < self.size
+            if create:
+                self.created += 1
+        if create:
+            try:
+                return self._new_reader()
+            except Exception:
+                with self.lock:
+                    self.created -= 1
+                raise
+        # Pool is full: wait for another caller to hand its reader back
+        return self.idle.get()
+
+    def release(self, reader):
+        self.idle.put(reader)
+
+
+def _get_reader_pool(languages, pool_size=None) -> _ReaderPool:
+    key = tuple(languages)
+    with _easyocr_lock:
+        pool = _easyocr_pools.get(key)
+        if pool is None:
+            pool = _ReaderPool(key, pool_size or EASYOCR_POOL_SIZE)
+            _easyocr_pools[key] = pool
+        elif pool_size and pool_size > pool.size:
+            pool.size = pool_size
+    return pool
+
+
+@contextmanager
+def easyocr_reader(languages=("en",)):
+    """Borrow a shared EasyOCR reader for the given languages.
+
+    Usage::
+
+        with easyocr_reader(["en"]) as reader:
+            results = reader.readtext(image_array)
+    """
+    pool = _get_reader_pool(languages)
+    reader = pool.acquire()
+    try:
+        yield reader
+    finally:
+        pool.release(reader)
+
+
+def preload_easyocr_readers(languages=("en",), pool_size=None):
+    """Create the EasyOCR readers for ``languages`` ahead of the first request.
+
+    :param languages: Language list the readers are built for.
+    :param pool_size: Number of readers to keep; defaults to EASYOCR_POOL_SIZE.
+    """
+    pool = _get_reader_pool(languages, pool_size)
+    readers = [pool.acquire() for _ in range(pool.size)]
+    for reader in readers:
+        pool.release(reader)
+
+
+def record_inference_time(engine: str, seconds: float):
+    """Add one inference call of the given engine to the metrics."""
+    with _metrics_lock:
+        _metrics[f"{engine}_inference_seconds"] = _metrics.get(f"{engine}_inference_seconds", 0.0) + seconds
+        _metrics[f"{engine}_inference_calls"] = _metrics.get(f"{engine}_inference_calls", 0) + 1
+
+
+def get_model_metrics() -> dict:
+    """Return a snapshot of model load time vs. inference time counters."""
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def warm_up_models(easyocr_languages=None):
+    """Preload the OCR models so the first request does not pay the load cost.
+
+    Call this once at service start.
+
+    :param easyocr_languages: Also preload EasyOCR readers for this language list.
+    """
+    get_surya_models()
+    if easyocr_languages:
+        preload_easyocr_readers(easyocr_languages)
+    return get_model_metrics()
@@ -0,0 +1,167 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Optional, Tuple
+from utils.ocr_tools.document_loader import as_document
+from utils.ocr_tools.ocr_result import OcrDocument, OcrPage
+from utils.ocr_tools.surya_ocr_tool import get_image_text_suryaocr, get_pages_suryaocr
+from utils.ocr_tools.easy_ocr_tool import get_image_text_easyocr, get_pages_easyocr, extract_pages
+
+# Cascade: Surya lines below LINE_CONFIDENCE_THRESHOLD are re-read by EasyOCR,
+# and a page whose mean Surya confidence is below PAGE_CONFIDENCE_THRESHOLD is
+# read by EasyOCR as a whole.
+LINE_CONFIDENCE_THRESHOLD = 0.8
+PAGE_CONFIDENCE_THRESHOLD = 0.6
+# Margin (pixels) added around a line box before re-reading it
+LINE_CROP_PADDING = 4
+
+
+_torch_threads_lock = threading.Lock()
+_torch_threads_users = 0
+_torch_threads_saved = None
+
+
+@contextmanager
+def _split_torch_threads(num_threads: int):
+    """Cap torch's intra-op threads while both engines run, then restore the previous value."""
+    global _torch_threads_users, _torch_threads_saved
+    try:
+        import torch
+    except ImportError:
+        yield
+        return
+    # torch.set_num_threads is process-wide (ATen's pool size, inherited by
+    # threads created later, and MKL's global setting), not per thread. So it
+    # is set once for the duration of the dual run, shared by overlapping dual
+    # runs, and put back when the last one finishes.
+    with _torch_threads_lock:
+        if _torch_threads_users == 0:
+            _torch_threads_saved = torch.get_num_threads()
+            torch.set_num_threads(num_threads)
+        _torch_threads_users += 1
+    try:
+        yield
+    finally:
+        with _torch_threads_lock:
+            _torch_threads_users -= 1
+            if _torch_threads_users == 0:
+                torch.set_num_threads(_torch_threads_saved)
+
+
+def get_image_text_dual_ocr(image_path, torch_threads: Optional[int] = None) -> Tuple[str, str]:
+    """Run Surya and EasyOCR on the same document at the same time.
+
+    Both engines read the pages of one shared Document, each in its own
+    worker thread with half of the CPU cores, so the wall-clock time is close
+    to the slower engine rather than the sum of both. Torch's thread count is
+    restored once both engines finish.
+
+    :param image_path: Path to the image or PDF file, or a loaded Document.
+    :param torch_threads: Torch threads per engine; defaults to half the cores.
+    :return: Tuple of (surya_text, easyocr_text).
+    """
+    document = as_document(image_path)
+    num_threads = torch_threads or max(1, (os.cpu_count() or 2) // 2)
+
+    # The cap is set before the worker threads start so both inherit it
+    with _split_torch_threads(num_threads), \
+            ThreadPoolExecutor(max_workers=2, thread_name_prefix="dual-ocr") as executor:
+        surya_future = executor.submit(get_image_text_suryaocr, document)
+        easyocr_future = executor.submit(get_image_text_easyocr, document)
+        return surya_future.result(), easyocr_future.result()
+
+
+def _line_confidence(line) -> float:
+    # Older Surya releases report no confidence; treat those lines as certain
+    return 1.0 if line.confidence is None else float(line.confidence)
+
+
+def _page_confidence(page: OcrPage) -> float:
+    """Mean line confidence weighted by the number of characters per line."""
+    total_chars = sum(len(line.text) for line in page.lines)
+    if total_chars == 0:
+        return 0.0
+    return sum(_line_confidence(line) * len(line.text) for line in page.lines) / total_chars
+
+
+def _reread_lines(document, page: OcrPage, line_indices: list) -> OcrPage:
+    """Re-OCR the given Surya lines of a page with EasyOCR, keeping the better reading."""
+    # Streamed, not kept: the page is released once its lines are cropped
+    image = next(document.iter_pages(indices=[page.page_number - 1]))
+    width, height = image.size
+    crops = []
+    for line_index in line_indices:
+        x_min, y_min, x_max, y_max = page.lines[line_index].bbox
+        crops.append(image.crop((
+            max(0, int(x_min) - LINE_CROP_PADDING), max(0, int(y_min) - LINE_CROP_PADDING),
+            min(width, int(x_max) + LINE_CROP_PADDING), min(height, int(y_max) + LINE_CROP_PADDING),
+        )))
+    del image
+
+    lines = [line.to_line() for line in page.lines]
+    replaced = 0
+    for line_index, crop_result in zip(line_indices, extract_pages(crops)):
+        easyocr_confidence = crop_result.mean_confidence
+        if easyocr_confidence is None:
+            continue
+        if easyocr_confidence > _line_confidence(lines[line_index]):
+            lines[line_index] = replace(
+                lines[line_index],
+                text=" ".join(crop_result.lines.texts()),
+                confidence=easyocr_confidence,
+                engine="easyocr",
+            )
+            replaced += 1
+
+    print(f"Page {page.page_number}: EasyOCR replaced {replaced} of {len(line_indices)} uncertain lines")
+    return replace(page, lines=lines, source="surya+easyocr" if replaced else page.source)
+
+
+def get_pages_cascade_ocr(image_path, line_threshold: float = LINE_CONFIDENCE_THRESHOLD,
+                          page_threshold: float = PAGE_CONFIDENCE_THRESHOLD, first_page: int = 1,
+                          last_page: Optional[int] = None) -> OcrDocument:
+    """Read a document with Surya and call EasyOCR only where Surya is unsure.
+
+    Pages whose mean Surya confidence is below ``page_threshold`` (or where
+    Surya found nothing) are read again by EasyOCR as a whole. On other pages
+    only the lines below ``line_threshold`` are cropped and re-read, and the
+    EasyOCR reading is kept when it is more confident. Clean pages and
+    born-digital pages never touch EasyOCR.
+
+    :param image_path: Path to the image or PDF file, or a loaded Document.
+    :param first_page: First page to read (1-based).
+    :param last_page: Last page to read (1-based, inclusive); defaults to the last page.
+    :return: OcrDocument; each line records the engine its text came from.
+    """
+    document = as_document(image_path)
+    pages = get_pages_suryaocr(document, first_page=first_page, last_page=last_page).pages
+
+    for position, page in enumerate(pages):
+        if page.source != "surya":
+            continue
+        if _page_confidence(page) < page_threshold:
+            print(f"Page {page.page_number}: low Surya confidence, escalating the page to EasyOCR")
+            pages[position] = get_pages_easyocr(document, first_page=page.page_number, last_page=page.page_number)[0]
+            continue
+        uncertain = [i for i, line in enumerate(page.lines) if _line_confidence(line) < line_threshold]
+        if uncertain:
+            pages[position] = _reread_lines(document, page, uncertain)
+
+    return OcrDocument(pages)
+
+
+def get_image_text_cascade_ocr(image_path, line_threshold: float = LINE_CONFIDENCE_THRESHOLD,
+                               page_threshold: float = PAGE_CONFIDENCE_THRESHOLD) -> str:
+    """Extract text with Surya, falling back to EasyOCR for uncertain lines or pages.
+
+    :param image_path: Path to the image or PDF file, or a loaded Document.
+    :return: Extracted text as a string or error message.
+    """
+    try:
+        return get_pages_cascade_ocr(image_path, line_threshold, page_threshold).text
+    except FileNotFoundError:
+        return f"Error: File not found at {image_path}"
+    except Exception as e:
+        return f"Error: Could not process the image. {str(e)}"
@@ -0,0 +1,74 @@
+import os
+import threading
+from importlib import metadata
+from typing import Optional
+from utils.kv_cache import SqliteLRUCache
+from utils.ocr_tools.ocr_result import OcrPage
+
+OCR_CACHE_PATH = os.environ.get(
+    "OCR_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "document_ocr", "ocr_cache.sqlite3")
+)
+OCR_CACHE_MAX_BYTES = int(os.environ.get("OCR_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Installed distribution of each engine; its version is part of the cache key
+# so upgrading a model invalidates what the old one produced.
+ENGINE_PACKAGES = {
+    "surya": "surya-ocr",
+    "easyocr": "easyocr",
+}
+
+# Bumped whenever the stored page layout changes
+CACHE_FORMAT_VERSION = 3
+
+_cache_lock = threading.Lock()
+_cache = None
+
+
+def get_ocr_cache() -> SqliteLRUCache:
+    """Return the process-wide OCR result cache, opening it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SqliteLRUCache(OCR_CACHE_PATH, OCR_CACHE_MAX_BYTES)
+    return _cache
+
+
+def engine_version(engine: str) -> str:
+    try:
+        return metadata.version(ENGINE_PACKAGES.get(engine, engine))
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def make_cache_key(content_hash: str, page_index: int, engine: str, dpi: int, variant: str = "") -> str:
+    """Key an OCR result by file content, page, engine, engine version, DPI and page processing."""
+    key = f"v{CACHE_FORMAT_VERSION}:{content_hash}:{page_index}:{engine}:{engine_version(engine)}:{dpi}"
+    return f"{key}:{variant}" if variant else key
+
+
+def _document_key(document, page_index: int, engine: str) -> str:
+    return make_cache_key(document.content_hash, page_index, engine, document.dpi, document.page_variant(page_index))
+
+
+def get_cached_page(document, page_index: int, engine: str) -> Optional[OcrPage]:
+    """Return the cached OCR result of one page of a Document, or None."""
+    try:
+        value = get_ocr_cache().get(_document_key(document, page_index, engine))
+    except Exception as e:
+        print("OCR cache read failed:", e)
+        return None
+    return OcrPage.from_bytes(value) if value is not None else None
+
+
+def put_cached_page(document, page_index: int, engine: str, page: OcrPage):
+    """Store the OCR result of one page of a Document."""
+    try:
+        get_ocr_cache().put(_document_key(document, page_index, engine), page.to_bytes())
+    except Exception as e:
+        print("OCR cache write failed:", e)
+
+
+def get_ocr_cache_stats() -> dict:
+    """Return hit/miss counters and size of the OCR cache."""
+    return get_ocr_cache().stats()
@@ -0,0 +1,220 @@
+import json
+import struct
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+
+# Engines a line can come from, stored as a one-byte code per line
+ENGINES = ("surya", "easyocr", "text_layer")
+_ENGINE_CODES = {engine: code for code, engine in enumerate(ENGINES)}
+
+_TABLE_MAGIC = b"OCRT"
+_TABLE_HEADER = struct.Struct("<4sI")
+_PAGE_HEADER = struct.Struct("<I")
+
+
+@dataclass(slots=True)
+class OcrLine:
+    """One recognised line: its text, box [x_min, y_min, x_max, y_max] in page pixels, confidence and engine."""
+    text: str
+    bbox: Tuple[float, float, float, float]
+    confidence: Optional[float]
+    engine: str
+
+
+class OcrLineView:
+    """Read-only view of one row of an OcrLineTable, with the same fields as OcrLine."""
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "OcrLineTable", index: int):
+        self._table = table
+        self._index = index
+
+    @property
+    def text(self) -> str:
+        table, i = self._table, self._index
+        return table.text_buffer[table.offsets[i]:table.offsets[i + 1]].decode("utf-8")
+
+    @property
+    def bbox(self) -> Tuple[float, float, float, float]:
+        return tuple(float(v) for v in self._table.boxes[self._index])
+
+    @property
+    def confidence(self) -> Optional[float]:
+        value = self._table.confidences[self._index]
+        return None if np.isnan(value) else float(value)
+
+    @property
+    def engine(self) -> str:
+        return ENGINES[self._table.engines[self._index]]
+
+    def to_line(self) -> OcrLine:
+        return OcrLine(self.text, self.bbox, self.confidence, self.engine)
+
+    def __repr__(self):
+        return f"OcrLineView(text={self.text!r}, bbox={self.bbox}, confidence={self.confidence}, engine={self.engine!r})"
+
+
+class OcrLineTable:
+    """Columnar storage for the lines of a page.
+
+    Boxes and confidences live in NumPy arrays, engines in one byte per line
+    and all text in a single UTF-8 buffer addressed by offsets, instead of one
+    Python object per line. Iterating or indexing yields OcrLineView objects.
+    A missing confidence is stored as NaN.
+    """
+    __slots__ = ("boxes", "confidences", "engines", "offsets", "text_buffer")
+
+    def __init__(self, boxes: np.ndarray, confidences: np.ndarray, engines: np.ndarray,
+                 offsets: np.ndarray, text_buffer: bytes):
+        self.boxes = boxes
+        self.confidences = confidences
+        self.engines = engines
+        self.offsets = offsets
+        self.text_buffer = text_buffer
+
+    @classmethod
+    def from_lines(cls, lines: Iterable) -> "OcrLineTable":
+        """Pack OcrLine (or any object with the same fields) into a table."""
+        lines = list(lines)
+        count = len(lines)
+        boxes = np.empty((count, 4), dtype=np.float32)
+        confidences = np.empty(count, dtype=np.float32)
+        engines = np.empty(count, dtype=np.uint8)
+        offsets = np.empty(count + 1, dtype=np.uint32)
+        encoded = []
+        position = 0
+        for i, line in enumerate(lines):
+            boxes[i] = line.bbox
+            confidences[i] = np.nan if line.confidence is None else line.confidence
+            engines[i] = _ENGINE_CODES[line.engine]
+            offsets[i] = position
+            text = line.text.encode("utf-8")
+            encoded.append(text)
+            position += len(text)
+        offsets[count] = position
+        return cls(boxes, confidences, engines, offsets, b"".join(encoded))
+
+    def __len__(self):
+        return len(self.engines)
+
+    def __getitem__(self, index: int) -> OcrLineView:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return OcrLineView(self, index)
+
+    def __iter__(self):
+        return (OcrLineView(self, i) for i in range(len(self)))
+
+    def texts(self) -> List[str]:
+        buffer, offsets = self.text_buffer, self.offsets.tolist()
+        return [buffer[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(self))]
+
+    @property
+    def nbytes(self) -> int:
+        return (self.boxes.nbytes + self.confidences.nbytes + self.engines.nbytes
+                + self.offsets.nbytes + len(self.text_buffer))
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact little-endian byte string."""
+        return b"".join((
+            _TABLE_HEADER.pack(_TABLE_MAGIC, len(self)),
+            self.boxes.astype("<f4", copy=False).tobytes(),
+            self.confidences.astype("<f4", copy=False).tobytes(),
+            self.engines.tobytes(),
+            self.offsets.astype("<u4", copy=False).tobytes(),
+            self.text_buffer,
+        ))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "OcrLineTable":
+        magic, count = _TABLE_HEADER.unpack_from(data, 0)
+        if magic != _TABLE_MAGIC:
+            raise ValueError("Not a serialized OcrLineTable")
+        position = _TABLE_HEADER.size
+
+        def take(dtype, length):
+            nonlocal position
+            array = np.frombuffer(data, dtype=dtype, count=length, offset=position)
+            position += array.nbytes
+            return array
+
+        boxes = take("<f4", count * 4).reshape(count, 4)
+        confidences = take("<f4", count)
+        engines = take(np.uint8, count)
+        offsets = take("<u4", count + 1)
+        return cls(boxes, confidences, engines, offsets, bytes(data[position:position + int(offsets[-1])]))
+
+
+@dataclass
+class OcrPage:
+    """The lines of one page (1-based ``page_number``) and which engine(s) produced them.
+
+    ``lines`` may be given as a list of OcrLine; it is packed into an
+    OcrLineTable, so reading it back yields OcrLineView objects.
+    """
+    page_number: int
+    lines: OcrLineTable = field(default_factory=list)
+    source: str = ""
+    # How ``text`` joins lines: Surya output has always been one line of text
+    # per page, EasyOCR output one line per detected box.
+    line_separator: str = "\n"
+
+    def __post_init__(self):
+        if not isinstance(self.lines, OcrLineTable):
+            self.lines = OcrLineTable.from_lines(self.lines)
+
+    @property
+    def text(self) -> str:
+        """Plain-text view of the page."""
+        return self.line_separator.join(self.lines.texts())
+
+    @property
+    def mean_confidence(self) -> Optional[float]:
+        scores = self.lines.confidences[~np.isnan(self.lines.confidences)]
+        return float(scores.mean()) if len(scores) else None
+
+    @classmethod
+    def from_text_layer(cls, page_number: int, text_layer: dict, line_separator: str = "\n") -> "OcrPage":
+        """Build a page from an embedded PDF text layer (see text_layer.extract_text_layers)."""
+        lines = [OcrLine(line["text"], tuple(line["bbox"]), 1.0, "text_layer") for line in text_layer["lines"]]
+        return cls(page_number, lines, "text_layer", line_separator)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the page (metadata plus line table) for the OCR cache."""
+        header = json.dumps({
+            "page": self.page_number, "source": self.source, "line_separator": self.line_separator,
+        }).encode("utf-8")
+        return _PAGE_HEADER.pack(len(header)) + header + self.lines.to_bytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "OcrPage":
+        (header_size,) = _PAGE_HEADER.unpack_from(data, 0)
+        start = _PAGE_HEADER.size
+        header = json.loads(data[start:start + header_size].decode("utf-8"))
+        lines = OcrLineTable.from_bytes(data[start + header_size:])
+        return cls(header["page"], lines, header["source"], header["line_separator"])
+
+
+@dataclass
+class OcrDocument:
+    """OCR output of a document, page by page. ``text`` gives the flattened string."""
+    pages: List[OcrPage] = field(default_factory=list)
+
+    def __iter__(self):
+        return iter(self.pages)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def __getitem__(self, index) -> OcrPage:
+        return self.pages[index]
+
+    @property
+    def text(self) -> str:
+        """Plain-text view: the page text, with '--- Page N ---' headers for multi-page documents."""
+        if len(self.pages) == 1:
+            return self.pages[0].text
+        return "\n\n".join(f"--- Page {page.page_number} ---\n{page.text}" for page in self.pages)
@@ -1,19 +1,12 @@
 from pydantic import BaseModel, ValidationError
 from typing import Literal, Optional
-from ollama import chat
+from utils.llm_client import AsyncLLMClient, LLMClient, get_async_llm_client, get_llm_client, response_validates
 
 
-def reframe_the_ocr_text_into_a_proper_format(surya_ocr_text: str, easy_ocr_text: str) -> Optional[dict]:
-    """
-    Extracts event information from the input text using OpenAI's API.
-    Args:
-        text (str): The input text containing document information.
-    Returns:
-        dict: Parsed document type and additional information or None if an error occurs.
-    """
-    try:
-        # Prepare the prompt
-        prompt = """
+def _chat_request(surya_ocr_text: str, easy_ocr_text: str) -> dict:
+    """Chat arguments (prompt, model, schema and options) for one document."""
+    # Prepare the prompt
+    prompt = """
 Aim: To analyze and extract relevant information from an OCR-extracted text of a document.
 
 Procedure:
@@ -27,15 +20,27 @@ Surya OCR Extracted Data: """ + surya_ocr_text + "\nEasyOCR Extracted Data: " +
 
  #+ f"The data for same image is extracted from two OCRs. Refer both the text for better understanding: 1) Surya OCR Extrcated Data: {surya_ocr_text}\n\n2) EasyOCR Extrcated Data: {easy_ocr_text}"
 
+    return dict(
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        model="llama3.3:70b",
+        options={'temperature': 0.2},
+    )
 
+
+def reframe_the_ocr_text_into_a_proper_format(surya_ocr_text: str, easy_ocr_text: str, client: Optional[LLMClient] = None) -> Optional[dict]:
+    """
+    Extracts event information from the input text using OpenAI's API.
+    Args:
+        text (str): The input text containing document information.
+        client (LLMClient): Shared Ollama client; defaults to get_llm_client().
+    Returns:
+        dict: Parsed document type and additional information or None if an error occurs.
+    """
+    try:
         # Send the chat request
-        response = chat(
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            model="llama3.3:70b",
-            options={'temperature': 0.2},
-        )
+        response = (client or get_llm_client()).chat(**_chat_request(surya_ocr_text, easy_ocr_text))
 
         # Parse and validate the response
         formatted_output = response.message.content
@@ -50,6 +55,127 @@ Surya OCR Extracted Data: """ + surya_ocr_text + "\nEasyOCR Extracted Data: " +
     return None
 
 
+async def reframe_the_ocr_text_into_a_proper_format_async(surya_ocr_text: str, easy_ocr_text: str, client: Optional[AsyncLLMClient] = None) -> Optional[dict]:
+    """
+    Async counterpart of reframe_the_ocr_text_into_a_proper_format,
+    using an AsyncLLMClient (get_async_llm_client() by default).
+    """
+    try:
+        response = await (client or get_async_llm_client()).chat(**_chat_request(surya_ocr_text, easy_ocr_text))
+
+        # Parse and validate the response
+        formatted_output = response.message.content
+        print("Validation successful:", formatted_output)
+        return formatted_output
+
+    except ValidationError as ve:
+        print("Validation error:", ve)
+    except Exception as e:
+        print("An error occurred during processing:", e)
+
+    return None
+
+
+def format_ocr_text_for_extraction(surya_ocr_text: str, easy_ocr_text: str = "") -> str:
+    """
+    Raw OCR text of both engines, laid out to go straight into a validator prompt.
+
+    Replaces the reframed text a validator used to receive, so a document
+    needs one schema-constrained call instead of a reframe pass plus one.
+    A blank EasyOCR text (the cascade already merged it) is left out.
+    """
+    text = """The data below was read from the document by OCR. It may have spelling errors, missing characters or a scrambled layout; use the context to interpret the most likely values.
+
+Surya OCR Extracted Data:
+""" + surya_ocr_text
+    if easy_ocr_text and easy_ocr_text.strip():
+        text += "\n\nEasyOCR Extracted Data:\n" + easy_ocr_text
+    return text
+
+
+class _ChatRecorder:
+    """Client wrapper that keeps the last answer, so extract_from_ocr_text can tell why a validator gave None."""
+
+    def __init__(self, client):
+        self._client = client
+        self.response = None
+        self.format = None
+
+    def chat(self, **kwargs):
+        self.response, self.format = None, kwargs.get("format")
+        self.response = self._client.chat(**kwargs)
+        return self.response
+
+
+class _AsyncChatRecorder(_ChatRecorder):
+    async def chat(self, **kwargs):
+        self.response, self.format = None, kwargs.get("format")
+        self.response = await self._client.chat(**kwargs)
+        return self.response
+
+
+def _failed_validation(recorder: _ChatRecorder) -> bool:
+    # Reframing only helps an answer that came back and does not fit the
+    # schema. Without an answer the call itself failed (host down, timeout)
+    # and would fail again; an answer that validates failed on something else.
+    # Without a pydantic format there is nothing to check, so it counts.
+    if recorder.response is None:
+        return False
+    return not response_validates(recorder.response, recorder.format)
+
+
+def extract_from_ocr_text(extract, surya_ocr_text: str, easy_ocr_text: str = "", client: Optional[LLMClient] = None,
+                          reframe_fallback: bool = False, reframe=None) -> Optional[dict]:
+    """
+    Run a validator on the raw OCR text in a single LLM call.
+
+    Args:
+        extract: Validator taking (text, client=...) and returning None when
+            the response fails validation, e.g. electricity_bill_extract_event_information.
+        surya_ocr_text (str): Surya (or cascade) OCR text.
+        easy_ocr_text (str): EasyOCR text, blank if not available.
+        client (LLMClient): Shared Ollama client; defaults to get_llm_client().
+        reframe_fallback (bool): When the single call fails validation, reframe
+            the OCR text and run the validator again on the reframed text. A
+            call that got no answer (server down, timeout) is not retried.
+        reframe: Reframe function taking (surya_ocr_text, easy_ocr_text, client=...);
+            defaults to reframe_the_ocr_text_into_a_proper_format.
+    Returns:
+        dict: The validator's result, or None if every attempt failed.
+    """
+    client = client or get_llm_client()
+    recorder = _ChatRecorder(client)
+    result = extract(format_ocr_text_for_extraction(surya_ocr_text, easy_ocr_text), client=recorder)
+    if result is not None or not reframe_fallback or not _failed_validation(recorder):
+        return result
+
+    print("Single-call extraction failed validation; retrying on reframed OCR text")
+    formatted_text = (reframe or reframe_the_ocr_text_into_a_proper_format)(surya_ocr_text, easy_ocr_text, client=client)
+    if formatted_text is None:
+        return None
+    return extract(formatted_text, client=client)
+
+
+async def extract_from_ocr_text_async(extract, surya_ocr_text: str, easy_ocr_text: str = "",
+                                      client: Optional[AsyncLLMClient] = None, reframe_fallback: bool = False,
+                                      reframe=None) -> Optional[dict]:
+    """
+    Async counterpart of extract_from_ocr_text; ``extract`` and ``reframe``
+    are async functions (reframe defaults to reframe_the_ocr_text_into_a_proper_format_async).
+    """
+    client = client or get_async_llm_client()
+    recorder = _AsyncChatRecorder(client)
+    result = await extract(format_ocr_text_for_extraction(surya_ocr_text, easy_ocr_text), client=recorder)
+    if result is not None or not reframe_fallback or not _failed_validation(recorder):
+        return result
+
+    print("Single-call extraction failed validation; retrying on reframed OCR text")
+    formatted_text = await (reframe or reframe_the_ocr_text_into_a_proper_format_async)(surya_ocr_text, easy_ocr_text, client=client)
+    if formatted_text is None:
+        return None
+    return await extract(formatted_text, client=client)
+
+
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,133 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+from surya.ocr import run_ocr
+from utils.ocr_tools.model_registry import get_surya_models, record_inference_time
+
+DEFAULT_MAX_BATCH_SIZE = 8
+DEFAULT_MAX_WAIT_MS = 25
+
+_batcher_lock = threading.Lock()
+_batcher = None
+
+
+class _Request:
+    __slots__ = ("image", "languages", "future")
+
+    def __init__(self, image, languages):
+        self.image = image
+        self.languages = languages
+        self.future = Future()
+
+
+class SuryaBatcher:
+    """Collects pages from concurrent callers and runs them through one run_ocr call.
+
+    A background thread waits for the first page, then keeps collecting for up
+    to ``max_wait_ms`` or until ``max_batch_size`` pages are queued, runs the
+    batch and hands each caller its own prediction through a Future.
+    """
+
+    def __init__(self, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue = queue.Queue()
+        self._closed = False
+        # Makes the closed check and the enqueue in submit() atomic with close()
+        self._submit_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="surya-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, image, languages=("en",)) -> Future:
+        """Queue one PIL image; the Future resolves to its Surya prediction."""
+        request = _Request(image, list(languages))
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("SuryaBatcher is closed")
+            self._queue.put(request)
+        return request.future
+
+    def close(self):
+        """Stop the worker after the pages already queued have been processed."""
+        with self._submit_lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first: _Request) -> list:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                # Re-queue the stop marker so the loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            self._process(self._collect(request))
+
+    def _process(self, batch: list):
+        try:
+            det_model, det_processor, rec_model, rec_processor = get_surya_models()
+            start = time.perf_counter()
+            predictions = run_ocr(
+                [request.image for request in batch],
+                [request.languages for request in batch],
+                det_model, det_processor, rec_model, rec_processor,
+            )
+            record_inference_time("surya", time.perf_counter() - start)
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        predictions = list(predictions)
+        for index, request in enumerate(batch):
+            if index < len(predictions):
+                request.future.set_result(predictions[index])
+            else:
+                # Never leave a caller waiting on a Future nobody will resolve
+                request.future.set_exception(RuntimeError(
+                    f"Surya returned {len(predictions)} predictions for a batch of {len(batch)} pages"
+                ))
+
+
+def enable_surya_batching(max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: float = DEFAULT_MAX_WAIT_MS) -> SuryaBatcher:
+    """Route every Surya OCR call in this process through a shared batcher.
+
+    :param max_batch_size: Largest number of pages sent to run_ocr at once.
+    :param max_wait_ms: How long the first queued page waits for company.
+    :return: The shared batcher.
+    """
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = SuryaBatcher(max_batch_size, max_wait_ms)
+        return _batcher
+
+
+def disable_surya_batching():
+    """Stop the shared batcher; Surya calls go back to running directly."""
+    global _batcher
+    with _batcher_lock:
+        batcher, _batcher = _batcher, None
+    if batcher is not None:
+        batcher.close()
+
+
+def get_surya_batcher() -> Optional[SuryaBatcher]:
+    """Return the shared batcher, or None when batching is not enabled."""
+    return _batcher
@@ -1,39 +1,103 @@
-from PIL import Image
 from surya.ocr import run_ocr
-from surya.model.detection.model import load_model as load_det_model, load_processor as load_det_processor
-from surya.model.recognition.model import load_model as load_rec_model
-from surya.model.recognition.processor import load_processor as load_rec_processor
 import os
-from pdf2image import convert_from_path
+import time
+from typing import Optional
+from utils.ocr_tools.model_registry import get_surya_models, record_inference_time
+from utils.ocr_tools.document_loader import as_document
+from utils.ocr_tools.surya_batcher import get_surya_batcher
+from utils.ocr_tools.ocr_cache import get_cached_page, put_cached_page
+from utils.ocr_tools.ocr_result import OcrDocument, OcrLine, OcrPage
 
-def get_image_text_suryaocr(image_path: str):
+# Pages rasterized and recognised together; bounds memory on long statements
+MAX_PAGES_PER_BATCH = 4
+# Surya's plain-text view has always been each page's lines joined by spaces
+SURYA_LINE_SEPARATOR = " "
+
+def run_surya_ocr(images: list, languages=('en',)) -> list:
+    """Run Surya OCR on a list of PIL Images and return one prediction per image.
+
+    When batching is enabled (see surya_batcher.enable_surya_batching) the pages
+    are queued and may share a run_ocr call with other in-flight requests.
+    """
+    batcher = get_surya_batcher()
+    if batcher is not None:
+        futures = [batcher.submit(image, languages) for image in images]
+        return [future.result() for future in futures]
+
+    # Shared detection and recognition models, loaded once per process
+    det_model, det_processor, rec_model, rec_processor = get_surya_models()
+
+    start = time.perf_counter()
+    predictions = run_ocr(images, [list(languages)] * len(images), det_model, det_processor, rec_model, rec_processor)
+    record_inference_time("surya", time.perf_counter() - start)
+    return predictions
+
+def _prediction_to_page(page_number: int, prediction) -> OcrPage:
+    lines = [
+        OcrLine(line.text, tuple(float(v) for v in line.bbox), line.confidence, "surya")
+        for line in prediction.text_lines
+    ]
+    return OcrPage(page_number, lines, "surya", SURYA_LINE_SEPARATOR)
+
+def get_pages_suryaocr(image_path, first_page: int = 1, last_page: Optional[int] = None,
+                       max_pages_per_batch: int = MAX_PAGES_PER_BATCH, use_text_layer: bool = True,
+                       use_cache: bool = True) -> OcrDocument:
+    """Run Surya OCR over a range of pages, several pages per run_ocr call.
+
+    :param image_path: Path to the image or PDF file, or a loaded Document.
+    :param first_page: First page to read (1-based).
+    :param last_page: Last page to read (1-based, inclusive); defaults to the last page.
+    :param max_pages_per_batch: Most pages rasterized and sent to run_ocr at once, bounding memory.
+    :param use_text_layer: Take the embedded text of born-digital PDF pages instead of running OCR.
+    :param use_cache: Reuse OCR results stored for the same file content, page, model version and DPI.
+    :return: OcrDocument with one OcrPage (lines with box, confidence and engine) per page.
+    """
+    document = as_document(image_path)
+    last_index = document.page_count - 1 if last_page is None else min(last_page, document.page_count) - 1
+    indices = list(range(max(first_page, 1) - 1, last_index + 1))
+
+    pages = {}
+    if use_text_layer:
+        for index in indices:
+            text_layer = document.text_layer(index)
+            if text_layer is not None:
+                pages[index] = OcrPage.from_text_layer(index + 1, text_layer, SURYA_LINE_SEPARATOR)
+        if pages:
+            print(f"Using embedded PDF text layer for {len(pages)} page(s) instead of OCR")
+
+    if use_cache:
+        for index in indices:
+            if index not in pages:
+                cached = get_cached_page(document, index, "surya")
+                if cached is not None:
+                    pages[index] = cached
+
+    scanned = [index for index in indices if index not in pages]
+    batch_size = max(1, max_pages_per_batch)
+    for offset in range(0, len(scanned), batch_size):
+        batch = scanned[offset:offset + batch_size]
+        images = list(document.iter_pages(indices=batch))
+        predictions = run_surya_ocr(images, ['en'])
+        for index, prediction in zip(batch, predictions):
+            pages[index] = _prediction_to_page(index + 1, prediction)
+            if use_cache:
+                put_cached_page(document, index, "surya", pages[index])
+
+    return OcrDocument([pages[index] for index in indices])
+
+def get_image_text_suryaocr(image_path, use_text_layer: bool = True, first_page: int = 1, last_page: Optional[int] = None,
+                            use_cache: bool = True):
     """Extracts text from the given image using OCR models.
     
-    :param image_path: Path to the image file.
+    :param image_path: Path to the image or PDF file, or a loaded Document.
+    :param use_text_layer: Return the embedded text of born-digital PDFs without running OCR.
+    :param first_page: First page to read (1-based).
+    :param last_page: Last page to read (1-based, inclusive); defaults to the last page.
+    :param use_cache: Reuse OCR results cached for the same file content.
     :return: Extracted text as a string or error message.
     """
     try:
-        # Open the image file or convert PDF to images
-        if image_path.lower().endswith(".pdf"):
-            print(f"Converting PDF {image_path} to images...")
-            images = convert_from_path(image_path)
-            print("Converted PDF to image")
-            image = images[0]  # Use the first page of the PDF as an image
-        else:
-            image = Image.open(image_path)
-    
-        # Load detection and recognition models and processors
-        det_processor, det_model = load_det_processor(), load_det_model()
-        rec_model, rec_processor = load_rec_model(), load_rec_processor()
-        
-        # Run OCR on the image
-        predictions = run_ocr([image], [['en']], det_model, det_processor, rec_model, rec_processor)
-        
-        # Extract text from predictions
-        text_lines = [text_line.text_lines for text_line in predictions]
-        extracted_text = " ".join([line.text for line in text_lines[0]])
-        
-        return extracted_text
+        return get_pages_suryaocr(image_path, first_page, last_page, use_text_layer=use_text_layer, use_cache=use_cache).text
     except FileNotFoundError:
         return f"Error: File not found at {image_path}"
     except Exception as e:
@@ -0,0 +1,71 @@
+import subprocess
+import xml.etree.ElementTree as ET
+from typing import List, Optional
+
+# pdftotext ships with poppler-utils, which pdf2image already requires.
+PDFTOTEXT = "pdftotext"
+XHTML = "{http://www.w3.org/1999/xhtml}"
+
+# A page needs at least this much readable text before OCR is skipped for it.
+MIN_TEXT_CHARS = 40
+MIN_READABLE_RATIO = 0.6
+
+
+def extract_text_layers(pdf_path: str, dpi: int = 72) -> List[dict]:
+    """
+    Read the embedded text layer of every page of a PDF with its positions.
+
+    Args:
+        pdf_path: Path to the PDF file.
+        dpi: Resolution the boxes are scaled to, so they line up with pages
+            rasterized at the same DPI (72 keeps PDF points).
+
+    Returns:
+        One dict per page: {"page", "text", "lines": [{"text", "bbox"}]},
+        where bbox is [x_min, y_min, x_max, y_max].
+    """
+    output = subprocess.run(
+        [PDFTOTEXT, "-bbox-layout", "-enc", "UTF-8", pdf_path, "-"],
+        capture_output=True, check=True,
+    ).stdout
+    scale = dpi / 72.0
+
+    pages = []
+    root = ET.fromstring(output)
+    for page_number, page in enumerate(root.iter(f"{XHTML}page"), start=1):
+        lines = []
+        for line in page.iter(f"{XHTML}line"):
+            words = [word.text or "" for word in line.iter(f"{XHTML}word")]
+            text = " ".join(w for w in words if w)
+            if not text:
+                continue
+            bbox = [round(float(line.get(key)) * scale, 1) for key in ("xMin", "yMin", "xMax", "yMax")]
+            lines.append({"text": text, "bbox": bbox})
+        pages.append({
+            "page": page_number,
+            "text": "\n".join(line["text"] for line in lines),
+            "lines": lines,
+        })
+    return pages
+
+
+def has_usable_text_layer(page_text: str) -> bool:
+    """
+    Decide whether an embedded text layer can stand in for OCR.
+
+    Scanned pages have no text, and PDFs with broken font encodings yield
+    mostly replacement characters or symbols; both fall back to OCR.
+    """
+    text = "".join(page_text.split())
+    if len(text) < MIN_TEXT_CHARS:
+        return False
+    readable = sum(1 for ch in text if ch.isalnum() and ch != "�")
+    return readable / len(text) >= MIN_READABLE_RATIO
+
+
+def get_text_layer_page(pages: List[dict], page_index: int) -> Optional[dict]:
+    """Return the text layer of one page (0-based) if it is usable, else None."""
+    if page_index >= len(pages):
+        return None
+    page = pages[page_index]
+    return page if has_usable_text_layer(page["text"]) else None